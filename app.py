@@ -1,11 +1,20 @@
 """
 Enhanced PyAOS-CX Automation Toolkit - Main Flask Application
 """
+import atexit
 import logging
+import queue
+import re
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
+from functools import lru_cache, wraps
 from flask import Flask, request, jsonify, render_template, redirect, make_response, send_from_directory
 from werkzeug.middleware.proxy_fix import ProxyFix
 from typing import Dict, Any, List, Optional
+from urllib.parse import quote, unquote
 import requests
 from config.settings import Config
 from config.switch_inventory import inventory, SwitchInfo
@@ -18,59 +27,220 @@ from core.exceptions import (
     VLANOperationError, UnknownSwitchError, SwitchConnectionError
 )
 from core.api_logger import api_logger
-from core.cache import get_cached_or_fetch, interface_cache, vlan_cache, invalidate_switch_cache
+from core import json_codec
+from core.cache import TTLCache, get_cached, get_cached_or_fetch, switch_cache, interface_cache, vlan_cache, invalidate_switch_cache, invalidate_switch_tags
 
-# Capability cache for switch-specific features
-capability_cache = {}
-CAPABILITY_CACHE_TTL = 60  # seconds
+try:
+    import ijson
+except ImportError:  # Optional: fall back to a full json parse of list responses
+    ijson = None
+
+# Capability cache for switch-specific features; a switch's platform does not
+# change while it is running, so detection only needs to happen once a day
+CAPABILITY_CACHE_TTL = 86400  # seconds
+capability_cache = TTLCache(default_ttl=CAPABILITY_CACHE_TTL, maxsize=512, jitter=600)
+
+# Fixed capabilities per platform family; poe_supported None means the chassis
+# has to be probed for PoE power data
+PLATFORM_CAPABILITIES = {
+    '6200': {'poe_supported': None, 'expected_psu_slots': 1, 'expected_fan_zones': 0},
+    # PoE-capable but PoE endpoints don't work via REST API; no fan monitoring
+    '6300': {'poe_supported': None, 'expected_psu_slots': 2, 'expected_fan_zones': 0},
+    # High-speed switches don't have PoE
+    '9300': {'poe_supported': False, 'expected_psu_slots': 2, 'expected_fan_zones': 4},
+    # Core switches don't have PoE
+    '10000': {'poe_supported': False, 'expected_psu_slots': 2, 'expected_fan_zones': 2},
+}
 
 # Legacy cache variables - now using TTL cache from core.cache
 # interface_cache = {}  # Now imported from core.cache
 INTERFACE_CACHE_TTL = 300  # seconds
 
+# Overview responses are shared by all dashboard polls within this window
+OVERVIEW_CACHE_TTL = 60  # seconds
+
+# CPU polling: switches whose CPU endpoint keeps failing are skipped for a while
+CPU_REQUEST_TIMEOUT = 2  # seconds
+CPU_MAX_FAILURES = 2
+_cpu_failures = TTLCache(default_ttl=60)
+_cpu_disabled = TTLCache(default_ttl=300)
+
+# Authenticated sessions reused across route calls without re-validation
+SESSION_REUSE_TTL = 30  # seconds
+_session_cache = TTLCache(default_ttl=SESSION_REUSE_TTL)
+
+# Last ETag and decoded body per URL for conditional GETs. Only the few bulk
+# collections per switch (interfaces, VLANs, chassis) use it, never per-port URLs
+_etag_cache = TTLCache(default_ttl=3600, maxsize=1024)
+
+# Shared pool for fanning out switch GETs; only submit leaf requests here, never
+# work that itself waits on this pool. A single fan-out is capped by the _fan_out
+# limit (SWITCH_FETCH_CONCURRENCY); all requests to one switch together are capped
+# by the session adapter (SWITCH_MAX_CONNECTIONS).
+_io_pool = None
+_io_pool_lock = threading.Lock()
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+# Hand log records to a background listener so request threads never wait
+# on console/file writes; the configured handlers now run on that thread.
+_log_queue = queue.Queue(maxsize=10000)
+_root_logger = logging.getLogger()
+_log_listener = QueueListener(_log_queue, *_root_logger.handlers, respect_handler_level=True)
+_root_logger.handlers = [_DroppingQueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
+# Only the fields the UI reads are requested to keep per-object payloads small
+_INTERFACE_ATTRIBUTES = 'admin_state,link_state,link_speed,type,description,mtu,vlan_tag,vlan_trunks'
+_VLAN_ATTRIBUTES = 'name,admin,oper_state,description'
+_CHASSIS_ATTRIBUTES = 'power_supplies,fans,poe_power'
+
+# Physical front-panel ports (1/1/N), excluding sub-interfaces such as 1/1/1:1
+_PHY_RE = re.compile(r'1/1/[^:]*\Z')
+
+def _url_key(key: str) -> str:
+    """Percent-encode a resource key (e.g. 1/1/1) for use as one URL path segment.
+
+    Commas are left as-is: AOS-CX uses them to separate composite key parts.
+    """
+    return quote(key, safe=',')
+
+def _get_io_pool() -> ThreadPoolExecutor:
+    """Return the shared switch I/O pool, creating it on first use."""
+    global _io_pool
+    if _io_pool is None:
+        with _io_pool_lock:
+            if _io_pool is None:
+                _io_pool = ThreadPoolExecutor(max_workers=Config.SWITCH_IO_WORKERS,
+                                              thread_name_prefix='switch-io')
+                atexit.register(_io_pool.shutdown, wait=False)
+    return _io_pool
+
+def _fan_out(fn, items, limit: Optional[int] = None) -> List[Any]:
+    """Call fn on each item via the shared I/O pool and return results in order.
+
+    At most `limit` calls are in flight at once, so one switch cannot occupy
+    the whole pool (or open a burst of TLS sessions) during a large fan-out.
+    """
+    if limit is None:
+        limit = Config.SWITCH_FETCH_CONCURRENCY
+    pool = _get_io_pool()
+    indexed = iter(enumerate(items))
+    results: Dict[int, Any] = {}
+    pending = {pool.submit(fn, item): index for index, item in islice(indexed, limit)}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+        for index, item in islice(indexed, len(done)):
+            pending[pool.submit(fn, item)] = index
+    return [results[index] for index in range(len(results))]
+
+def _get_json(switch_ip: str, session_obj, url: str, timeout: float = 5) -> Optional[Any]:
+    """GET and log a JSON document; returns None unless the switch answers 200."""
+    response = session_obj.get(url, timeout=timeout, verify=Config.SSL_VERIFY)
+    api_logger.log_api_call('GET', url, {}, None, response.status_code, response.content, 0, switch_ip)
+    if response.status_code != 200:
+        return None
+    return json_codec.loads(response.content)
+
+def _get_json_conditional(switch_ip: str, session_obj, url: str, timeout: float) -> tuple:
+    """GET a JSON document, revalidating any copy seen before with its ETag.
+
+    Returns (status_code, data). A 304 is reported as 200 with the stored
+    data; data is None for any other non-200 status. The decoded body is
+    shared between callers and must be treated as read-only. Use this only
+    for bulk collections; per-item URLs would crowd them out of the cache.
+    """
+    cached = _etag_cache.get(url)
+    headers = {'If-None-Match': cached[0]} if cached else {}
+    response = session_obj.get(url, headers=headers, timeout=timeout, verify=Config.SSL_VERIFY)
+    api_logger.log_api_call('GET', url, headers, None, response.status_code, response.content, 0, switch_ip)
+    if response.status_code == 304 and cached:
+        return 200, cached[1]
+    if response.status_code != 200:
+        return response.status_code, None
+    data = json_codec.loads(response.content)
+    etag = response.headers.get('ETag')
+    if etag:
+        _etag_cache.set(url, (etag, data))
+    return 200, data
+
+def _fetch_physical_interface_names(switch_ip: str, session_obj, timeout: int = 10) -> Optional[List[str]]:
+    """Fetch the interface list and return only physical port names.
+
+    The list is streamed with ijson when available so that large chassis with
+    thousands of sub-interfaces never materialize the full dict in memory.
+    Returns None if the switch does not answer with 200.
+    """
+    base = direct_rest_manager.base_url(switch_ip)
+    interfaces_url = f"{base}/system/interfaces"
+    response = session_obj.get(interfaces_url, timeout=timeout, verify=Config.SSL_VERIFY, stream=True)
+    try:
+        # Body is consumed by the parser below, so only the status is logged
+        api_logger.log_api_call('GET', interfaces_url, {}, None, response.status_code, '', 0, switch_ip)
+        if response.status_code != 200:
+            return None
+        if ijson is not None:
+            response.raw.decode_content = True
+            return [name for name, _ in ijson.kvitems(response.raw, '') if _PHY_RE.match(name)]
+        return [name for name in json_codec.loads(response.content) if _PHY_RE.match(name)]
+    finally:
+        response.close()
+
 def capabilities_for(switch_ip: str, session_obj=None) -> Dict[str, Any]:
-    """Get cached capabilities for a switch or detect them."""
-    current_time = time.time()
-    
-    # Check cache first
-    if switch_ip in capability_cache:
-        cached = capability_cache[switch_ip]
-        if current_time - cached['timestamp'] < CAPABILITY_CACHE_TTL:
-            return cached['capabilities']
-    
-    # Need to detect capabilities
-    if not session_obj:
-        try:
+    """Get cached capabilities for a switch or detect them.
+
+    Results without a firmware version come from a failed system probe; they
+    are returned but not cached, so the next call detects again.
+    """
+    detected = False
+
+    def detect():
+        nonlocal session_obj, detected
+        if not session_obj:
             session_obj = direct_rest_manager._authenticate(switch_ip)
-        except Exception as e:
-            logger.warning(f"Failed to authenticate for capability detection on {switch_ip}: {e}")
-            # Return conservative defaults
-            return {
-                'poe_supported': False,
-                'cpu_supported': False,
-                'expected_psu_slots': 1,
-                'expected_fan_zones': 1
-            }
+        detected = True
+        return detect_switch_capabilities(switch_ip, session_obj)
     
-    capabilities = detect_switch_capabilities(switch_ip, session_obj)
-    
-    # Cache the result
-    capability_cache[switch_ip] = {
-        'capabilities': capabilities,
-        'timestamp': current_time
-    }
-    
-    return capabilities
+    try:
+        capabilities = capability_cache.get_or_set(switch_ip, detect)
+        if detected and not capabilities.get('firmware_version'):
+            capability_cache.invalidate(switch_ip)
+        return capabilities
+    except Exception as e:
+        logger.warning(f"Failed to authenticate for capability detection on {switch_ip}: {e}")
+        # Return conservative defaults
+        return {
+            'poe_supported': False,
+            'cpu_supported': False,
+            'expected_psu_slots': 1,
+            'expected_fan_zones': 1
+        }
 
 def detect_switch_capabilities(switch_ip: str, session_obj) -> Dict[str, Any]:
-    """Detect switch capabilities through endpoint probing."""
+    """Detect switch capabilities through endpoint probing.
+
+    The system, LLDP and port-count probes are independent, so they run
+    concurrently. Platform-specific values come from PLATFORM_CAPABILITIES;
+    the chassis is only probed for PoE on platforms that need it.
+    """
+    base = direct_rest_manager.base_url(switch_ip)
     capabilities = {
         'poe_supported': False,
         'cpu_supported': False,
@@ -78,39 +248,44 @@ def detect_switch_capabilities(switch_ip: str, session_obj) -> Dict[str, Any]:
         'expected_fan_zones': 1,
         'port_count': 0,
         'platform_name': '',
+        'firmware_version': '',
         'lldp_supported': False
     }
-    
-    # Get system info first for platform detection
-    try:
-        system_url = f"https://{switch_ip}/rest/v10.09/system"
+
+    def probe_system():
+        system_url = f"{base}/system"
         system_response = session_obj.get(system_url, timeout=10, verify=Config.SSL_VERIFY)
-        api_logger.log_api_call('GET', system_url, {}, None, system_response.status_code, system_response.text, 0)
-        
+        api_logger.log_api_call('GET', system_url, {}, None, system_response.status_code, system_response.content, 0, switch_ip)
         if system_response.status_code == 200:
-            system_data = system_response.json()
+            return json_codec.loads(system_response.content)
+        return None
+
+    def probe_lldp():
+        lldp_url = f"{base}/system/lldp"
+        lldp_response = session_obj.get(lldp_url, timeout=5, verify=Config.SSL_VERIFY)
+        api_logger.log_api_call('GET', lldp_url, {}, None, lldp_response.status_code, lldp_response.content, 0, switch_ip)
+        return lldp_response.status_code == 200
+
+    pool = _get_io_pool()
+    system_future = pool.submit(probe_system)
+    lldp_future = pool.submit(probe_lldp)
+    ports_future = pool.submit(_fetch_physical_interface_names, switch_ip, session_obj)
+
+    # Get system info for platform detection
+    try:
+        system_data = system_future.result()
+        if system_data is not None:
             platform_name = system_data.get('platform_name', '').lower()
             capabilities['platform_name'] = platform_name
+            capabilities['firmware_version'] = system_data.get('firmware_version', '')
             
-            # Platform-specific capability inference based on probe results
-            if '6200' in platform_name:
-                capabilities['poe_supported'] = _check_chassis_poe_support(switch_ip, session_obj)
-                capabilities['expected_psu_slots'] = 1
-                capabilities['expected_fan_zones'] = 0
-            elif '6300' in platform_name:
-                # PoE-capable but endpoints don't work via REST API
-                # Check chassis for PoE power data instead
-                capabilities['poe_supported'] = _check_chassis_poe_support(switch_ip, session_obj)
-                capabilities['expected_psu_slots'] = 2
-                capabilities['expected_fan_zones'] = 0  # No fan monitoring on 6300
-            elif '9300' in platform_name:
-                capabilities['poe_supported'] = False  # High-speed switches don't have PoE
-                capabilities['expected_psu_slots'] = 2
-                capabilities['expected_fan_zones'] = 4
-            elif '10000' in platform_name:
-                capabilities['poe_supported'] = False  # Core switches don't have PoE
-                capabilities['expected_psu_slots'] = 2
-                capabilities['expected_fan_zones'] = 2
+            # Platform-specific capabilities come from the table; only PoE may need a probe
+            platform = next((family for family in PLATFORM_CAPABILITIES if family in platform_name), None)
+            if platform is not None:
+                capabilities.update(PLATFORM_CAPABILITIES[platform])
+                if capabilities['poe_supported'] is None:
+                    # Check chassis for PoE power data instead
+                    capabilities['poe_supported'] = _check_chassis_poe_support(switch_ip, session_obj)
             else:
                 # Conservative defaults
                 capabilities['expected_psu_slots'] = 1
@@ -125,42 +300,31 @@ def detect_switch_capabilities(switch_ip: str, session_obj) -> Dict[str, Any]:
     
     # Test LLDP support
     try:
-        lldp_url = f"https://{switch_ip}/rest/v10.09/system/lldp"
-        lldp_response = session_obj.get(lldp_url, timeout=5, verify=Config.SSL_VERIFY)
-        api_logger.log_api_call('GET', lldp_url, {}, None, lldp_response.status_code, lldp_response.text, 0)
-        
-        if lldp_response.status_code == 200:
-            capabilities['lldp_supported'] = True
+        capabilities['lldp_supported'] = lldp_future.result()
     except Exception as e:
         logger.debug(f"LLDP probe failed for {switch_ip}: {e}")
     
     # Get port count from interfaces
     try:
-        interfaces_url = f"https://{switch_ip}/rest/v10.09/system/interfaces"
-        interfaces_response = session_obj.get(interfaces_url, timeout=10, verify=Config.SSL_VERIFY)
-        api_logger.log_api_call('GET', interfaces_url, {}, None, interfaces_response.status_code, interfaces_response.text, 0)
-        
-        if interfaces_response.status_code == 200:
-            interfaces_list = interfaces_response.json()
-            # Count physical interfaces only
-            physical_interfaces = [k for k in interfaces_list.keys() 
-                                 if ':' not in k and k.startswith('1/1/')]
+        physical_interfaces = ports_future.result()
+        if physical_interfaces is not None:
             capabilities['port_count'] = len(physical_interfaces)
     except Exception as e:
         logger.debug(f"Interface count probe failed for {switch_ip}: {e}")
-    
+
     logger.info(f"Detected capabilities for {switch_ip}: {capabilities}")
     return capabilities
 
 def _check_chassis_poe_support(switch_ip: str, session_obj) -> bool:
     """Check if chassis has PoE power data (alternative to REST PoE endpoints)."""
+    base = direct_rest_manager.base_url(switch_ip)
     try:
-        chassis_url = f"https://{switch_ip}/rest/v10.09/system/subsystems/chassis,1"
+        chassis_url = f"{base}/system/subsystems/chassis,1"
         chassis_response = session_obj.get(chassis_url, timeout=5, verify=Config.SSL_VERIFY)
-        api_logger.log_api_call('GET', chassis_url, {}, None, chassis_response.status_code, chassis_response.text, 0)
+        api_logger.log_api_call('GET', chassis_url, {}, None, chassis_response.status_code, chassis_response.content, 0, switch_ip)
         
         if chassis_response.status_code == 200:
-            chassis_data = chassis_response.json()
+            chassis_data = json_codec.loads(chassis_response.content)
             # Check if chassis has PoE power information
             return 'poe_power' in chassis_data
     except Exception as e:
@@ -169,54 +333,36 @@ def _check_chassis_poe_support(switch_ip: str, session_obj) -> bool:
 
 def get_cached_interfaces(switch_ip: str, session_obj=None) -> Dict[str, Any]:
     """Get cached interface data or fetch and cache if stale."""
-    current_time = time.time()
-    
-    # Check cache first
-    if switch_ip in interface_cache:
-        cached = interface_cache[switch_ip]
-        if current_time - cached['timestamp'] < INTERFACE_CACHE_TTL:
-            return cached['data']
-        else:
-            # Stale data - return immediately and refresh in background
-            # For now, we'll refresh synchronously to keep it simple
-            pass
-    
-    # Need to fetch interface data
-    if not session_obj:
-        try:
+    def fetch():
+        nonlocal session_obj
+        if not session_obj:
             session_obj = direct_rest_manager._authenticate(switch_ip)
-        except Exception as e:
-            logger.warning(f"Failed to authenticate for interface caching on {switch_ip}: {e}")
-            return {'interfaces': [], 'total_count': 0}
-    
-    interface_data = _fetch_bulk_interfaces(switch_ip, session_obj)
-    
-    # Cache the result
-    interface_cache[switch_ip] = {
-        'data': interface_data,
-        'timestamp': current_time
-    }
+        return _fetch_bulk_interfaces(switch_ip, session_obj)
     
-    return interface_data
+    try:
+        # Shares the entry used by the interfaces route
+        return get_cached_or_fetch(interface_cache, switch_ip, 'interfaces_bulk', fetch,
+                                   ttl=INTERFACE_CACHE_TTL, stale_while_revalidate=True)
+    except Exception as e:
+        logger.warning(f"Failed to authenticate for interface caching on {switch_ip}: {e}")
+        return {'interfaces': [], 'total_count': 0}
 
 def _fetch_interfaces_individually(switch_ip: str, session_obj, interfaces_list: Dict[str, str]) -> Dict[str, Any]:
     """Fallback method to fetch interface data individually when bulk call returns URLs.
     Uses concurrent fetches and short timeouts to avoid hangs on large port counts.
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    physical_interface_names = [name for name in interfaces_list.keys()
-                                if ':' not in name and name.startswith('1/1/')]
-    physical_interfaces = []
+    base = direct_rest_manager.base_url(switch_ip)
+    physical_interface_names = [name for name in interfaces_list if _PHY_RE.match(name)]
 
     def fetch_one(name: str):
         try:
-            encoded_name = name.replace('/', '%2F')
-            iface_url = f"https://{switch_ip}/rest/v10.09/system/interfaces/{encoded_name}"
+            encoded_name = _url_key(name)
+            iface_url = f"{base}/system/interfaces/{encoded_name}?attributes={_INTERFACE_ATTRIBUTES}"
             resp = session_obj.get(iface_url, timeout=2.5, verify=Config.SSL_VERIFY)
-            api_logger.log_api_call('GET', iface_url, {}, None, resp.status_code, resp.text, 0)
+            api_logger.log_api_call('GET', iface_url, {}, None, resp.status_code, resp.content, 0, switch_ip)
             if resp.status_code != 200:
                 return None
-            iface_data = resp.json()
+            iface_data = json_codec.loads(resp.content)
             admin_state = iface_data.get('admin_state', 'unknown')
             link_state = iface_data.get('link_state', 'unknown')
             if admin_state == 'down':
@@ -252,31 +398,33 @@ def _fetch_interfaces_individually(switch_ip: str, session_obj, interfaces_list:
             logger.debug(f"Failed to fetch interface {name}: {e}")
             return None
 
-    # Fetch concurrently with a reasonable worker count
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = {executor.submit(fetch_one, name): name for name in physical_interface_names}
-        for future in as_completed(futures):
-            result = future.result()
-            if result:
-                physical_interfaces.append(result)
+    # Fetch concurrently on the shared I/O pool, a few ports at a time
+    physical_interfaces = [result for result in _fan_out(fetch_one, physical_interface_names) if result]
 
     # Sort for consistency
     physical_interfaces.sort(key=lambda x: _natural_sort_key(x['name']))
     return {'interfaces': physical_interfaces, 'total_count': len(physical_interfaces)}
 
+def _mgmt_addresses(iface_data: Dict[str, Any]) -> tuple:
+    """Extract (ipv4, ipv6) from a management interface object."""
+    ipv4 = iface_data.get('ip4_address') or iface_data.get('ip_address')
+    if not ipv4 and isinstance(iface_data.get('ipv4'), dict):
+        ipv4 = iface_data['ipv4'].get('address') or iface_data['ipv4'].get('primary')
+    ipv6 = iface_data.get('ip6_address') or iface_data.get('ipv6')
+    return ipv4, ipv6
+
 def _fetch_bulk_interfaces(switch_ip: str, session_obj) -> Dict[str, Any]:
     """Fetch all interface data in bulk with VLAN attributes - returns physical and management interfaces."""
+    base = direct_rest_manager.base_url(switch_ip)
     try:
         # Single bulk call with VLAN attributes
-        bulk_url = f"https://{switch_ip}/rest/v10.09/system/interfaces?attributes=name,admin_state,link_state,link_speed,type,description,vlan_tag,vlan_trunks,mtu"
-        interfaces_response = session_obj.get(bulk_url, timeout=15, verify=Config.SSL_VERIFY)
-        api_logger.log_api_call('GET', bulk_url, {}, None, interfaces_response.status_code, interfaces_response.text, 0)
+        bulk_url = f"{base}/system/interfaces?attributes=name,admin_state,link_state,link_speed,type,description,vlan_tag,vlan_trunks,mtu,ip4_address"
+        status_code, interfaces_data = _get_json_conditional(switch_ip, session_obj, bulk_url, timeout=15)
         
-        if interfaces_response.status_code != 200:
-            logger.warning(f"Bulk interfaces call failed with {interfaces_response.status_code}")
+        if status_code != 200:
+            logger.warning(f"Bulk interfaces call failed with {status_code}")
             return {'interfaces': [], 'total_count': 0}
             
-        interfaces_data = interfaces_response.json()
         
         # Check if we got URLs instead of actual data (some switches don't support attributes parameter)
         sample_key = next(iter(interfaces_data)) if interfaces_data else None
@@ -289,76 +437,84 @@ def _fetch_bulk_interfaces(switch_ip: str, session_obj) -> Dict[str, Any]:
         # Separate physical and management interfaces
         physical_interfaces = []
         management_interfaces = []
+        pending_mgmt = []
         for name, iface_data in interfaces_data.items():
             lower_name = name.lower()
             is_mgmt = lower_name.startswith('mgmt') or iface_data.get('type', '').lower() == 'mgmt'
-            is_physical = (':' not in name and name.startswith('1/1/'))
+            is_physical = _PHY_RE.match(name) is not None
             if not (is_mgmt or is_physical):
                 continue
-                # Normalize interface data
-                admin_state = iface_data.get('admin_state', 'unknown')
-                link_state = iface_data.get('link_state', 'unknown')
-                
-                # Apply state normalization rules
-                if admin_state == 'down':
-                    status = 'disabled'
-                elif admin_state == 'up' and link_state == 'up':
-                    status = 'up'
-                else:
-                    status = 'down'
-                
-                # Format speed for display
-                link_speed = iface_data.get('link_speed', 0) or 0
-                speed_display = _format_interface_speed(link_speed)
-                
-                # Process VLAN membership
-                vlan_tag = iface_data.get('vlan_tag', {})
-                vlan_trunks = iface_data.get('vlan_trunks', {})
-                
-                # Extract untagged VLAN ID (vlan_tag is a dict with VLAN ID as key)
-                untagged_vlan = None
-                if isinstance(vlan_tag, dict) and vlan_tag:
-                    untagged_vlan = int(list(vlan_tag.keys())[0])
-                
-                # Extract tagged VLANs (vlan_trunks is a dict with VLAN IDs as keys)
-                tagged_vlans = []
-                if isinstance(vlan_trunks, dict):
-                    tagged_vlans = [int(vlan_id) for vlan_id in vlan_trunks.keys()]
-                
-                interface = {
-                    'name': name,
-                    'admin_state': admin_state,
-                    'link_state': link_state,
-                    'status': status,
-                    'speed': link_speed,
-                    'speed_display': speed_display,
-                    'type': iface_data.get('type', 'unknown'),
-                    'description': iface_data.get('description', '') or '',
-                    'mtu': iface_data.get('mtu', 0) or 0,
-                    'untagged_vlan': untagged_vlan,
-                    'tagged_vlans': tagged_vlans
-                }
-                
-                if is_mgmt:
-                    # Attempt to enrich with IP info from detailed endpoint
-                    try:
-                        encoded = name.replace('/', '%2F')
-                        detail_url = f"https://{switch_ip}/rest/v10.09/system/interfaces/{encoded}"
-                        det_resp = session_obj.get(detail_url, timeout=5, verify=Config.SSL_VERIFY)
-                        api_logger.log_api_call('GET', detail_url, {}, None, det_resp.status_code, det_resp.text, 0)
-                        if det_resp.status_code == 200:
-                            det = det_resp.json()
-                            ipv4 = det.get('ip4_address') or det.get('ip_address')
-                            if not ipv4 and isinstance(det.get('ipv4'), dict):
-                                ipv4 = det['ipv4'].get('address') or det['ipv4'].get('primary')
-                            ipv6 = det.get('ip6_address') or det.get('ipv6')
-                            interface['ipv4'] = ipv4
-                            interface['ipv6'] = ipv6
-                    except Exception as e:
-                        logger.debug(f"Mgmt interface detail fetch failed for {name}: {e}")
-                    management_interfaces.append(interface)
+
+            # Normalize interface data
+            admin_state = iface_data.get('admin_state', 'unknown')
+            link_state = iface_data.get('link_state', 'unknown')
+            
+            # Apply state normalization rules
+            if admin_state == 'down':
+                status = 'disabled'
+            elif admin_state == 'up' and link_state == 'up':
+                status = 'up'
+            else:
+                status = 'down'
+            
+            # Format speed for display
+            link_speed = iface_data.get('link_speed', 0) or 0
+            speed_display = _format_interface_speed(link_speed)
+            
+            # Process VLAN membership
+            vlan_tag = iface_data.get('vlan_tag', {})
+            vlan_trunks = iface_data.get('vlan_trunks', {})
+            
+            # Extract untagged VLAN ID (vlan_tag is a dict with VLAN ID as key)
+            untagged_vlan = None
+            if isinstance(vlan_tag, dict) and vlan_tag:
+                untagged_vlan = int(list(vlan_tag.keys())[0])
+            
+            # Extract tagged VLANs (vlan_trunks is a dict with VLAN IDs as keys)
+            tagged_vlans = []
+            if isinstance(vlan_trunks, dict):
+                tagged_vlans = [int(vlan_id) for vlan_id in vlan_trunks.keys()]
+            
+            interface = {
+                'name': name,
+                'admin_state': admin_state,
+                'link_state': link_state,
+                'status': status,
+                'speed': link_speed,
+                'speed_display': speed_display,
+                'type': iface_data.get('type', 'unknown'),
+                'description': iface_data.get('description', '') or '',
+                'mtu': iface_data.get('mtu', 0) or 0,
+                'untagged_vlan': untagged_vlan,
+                'tagged_vlans': tagged_vlans
+            }
+            
+            if is_mgmt:
+                # The bulk response usually carries the address already
+                if iface_data.get('ip4_address'):
+                    interface['ipv4'], interface['ipv6'] = _mgmt_addresses(iface_data)
                 else:
-                    physical_interfaces.append(interface)
+                    pending_mgmt.append(interface)
+                management_interfaces.append(interface)
+            else:
+                physical_interfaces.append(interface)
+        
+        def fetch_mgmt_detail(interface: Dict[str, Any]) -> None:
+            # Attempt to enrich with IP info from detailed endpoint
+            name = interface['name']
+            try:
+                encoded = _url_key(name)
+                detail_url = f"{base}/system/interfaces/{encoded}"
+                det_resp = session_obj.get(detail_url, timeout=5, verify=Config.SSL_VERIFY)
+                api_logger.log_api_call('GET', detail_url, {}, None, det_resp.status_code, det_resp.content, 0, switch_ip)
+                if det_resp.status_code == 200:
+                    interface['ipv4'], interface['ipv6'] = _mgmt_addresses(json_codec.loads(det_resp.content))
+            except Exception as e:
+                logger.debug(f"Mgmt interface detail fetch failed for {name}: {e}")
+        
+        # Remaining mgmt detail GETs run together instead of inside the loop
+        for future in [_get_io_pool().submit(fetch_mgmt_detail, iface) for iface in pending_mgmt]:
+            future.result()
         
         # Sort interfaces naturally by name
         physical_interfaces.sort(key=lambda x: _natural_sort_key(x['name']))
@@ -387,85 +543,132 @@ def _format_interface_speed(link_speed):
     else:
         return f'{link_speed}M'
 
+@lru_cache(maxsize=4096)
 def _natural_sort_key(interface_name):
     """Generate sort key for natural sorting of interface names like 1/1/1, 1/1/10."""
-    import re
+    parts = interface_name.split('/')
+    if all(part.isdigit() for part in parts):
+        # Fast path for slot/module/port names; same shape as the re.split key below
+        key = ['']
+        for part in parts:
+            key += [int(part), '/']
+        key[-1] = ''
+        return tuple(key)
     parts = re.split(r'(\d+)', interface_name)
-    return [int(part) if part.isdigit() else part for part in parts]
+    return tuple(int(part) if part.isdigit() else part for part in parts)
+
+def _poe_summary(poe_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a PoE port object to the fields the UI shows."""
+    return {
+        'enabled': poe_data.get('enabled', False),
+        'class': poe_data.get('class', 'N/A'),
+        'watts': poe_data.get('power_drawn', 0) or poe_data.get('watts', 0)
+    }
+
+def _fetch_bulk_poe(switch_ip: str, session_obj) -> Dict[str, Dict[str, Any]]:
+    """Fetch PoE data for every port in one call, keyed by interface name.
+    
+    Returns an empty dict if the switch rejects the collection request.
+    """
+    base = direct_rest_manager.base_url(switch_ip)
+    poe_url = f"{base}/system/poe/ports?depth=2"
+    try:
+        poe_response = session_obj.get(poe_url, timeout=10, verify=Config.SSL_VERIFY)
+        api_logger.log_api_call('GET', poe_url, {}, None, poe_response.status_code, poe_response.content, 0, switch_ip)
+        
+        if poe_response.status_code == 200:
+            ports = json_codec.loads(poe_response.content)
+            if isinstance(ports, dict):
+                return {unquote(name): _poe_summary(poe_data)
+                        for name, poe_data in ports.items() if isinstance(poe_data, dict)}
+        else:
+            logger.debug(f"Bulk PoE endpoint returned {poe_response.status_code} for {switch_ip}")
+    except Exception as e:
+        logger.debug(f"Bulk PoE fetch failed for {switch_ip}: {e}")
+    return {}
+
+def get_interface_poe(switch_ip: str, session_obj, interface_name: str) -> Optional[Dict[str, Any]]:
+    """Get PoE data for one interface from the cached bulk map, probing the port only if missing."""
+    poe_map = get_cached_or_fetch(interface_cache, switch_ip, 'poe_bulk',
+                                  lambda: _fetch_bulk_poe(switch_ip, session_obj),
+                                  ttl=INTERFACE_CACHE_TTL)
+    if interface_name in poe_map:
+        return poe_map[interface_name]
+    return _fetch_interface_poe(switch_ip, session_obj, interface_name)
 
 def _fetch_interface_poe(switch_ip: str, session_obj, interface_name: str) -> Dict[str, Any]:
     """Fetch per-interface PoE data with fallback endpoints."""
-    encoded_name = interface_name.replace('/', '%2F')
+    base = direct_rest_manager.base_url(switch_ip)
+    encoded_name = _url_key(interface_name)
     
     # Try per-interface PoE endpoints
     poe_endpoints = [
-        f"https://{switch_ip}/rest/v10.09/system/interfaces/{encoded_name}/poe",
-        f"https://{switch_ip}/rest/v10.09/system/poe/ports/{encoded_name}"
+        f"{base}/system/interfaces/{encoded_name}/poe",
+        f"{base}/system/poe/ports/{encoded_name}"
     ]
     
     for poe_url in poe_endpoints:
         try:
             poe_response = session_obj.get(poe_url, timeout=3, verify=Config.SSL_VERIFY)
-            api_logger.log_api_call('GET', poe_url, {}, None, poe_response.status_code, poe_response.text, 0)
+            api_logger.log_api_call('GET', poe_url, {}, None, poe_response.status_code, poe_response.content, 0, switch_ip)
             
             if poe_response.status_code == 200:
-                poe_data = poe_response.json()
-                return {
-                    'enabled': poe_data.get('enabled', False),
-                    'class': poe_data.get('class', 'N/A'),
-                    'watts': poe_data.get('power_drawn', 0) or poe_data.get('watts', 0)
-                }
+                return _poe_summary(json_codec.loads(poe_response.content))
         except Exception as e:
             logger.debug(f"PoE fetch failed for {interface_name} at {poe_url}: {e}")
     
     return None
 
 def _fetch_interface_lldp_neighbors(switch_ip: str, session_obj, interface_name: str) -> List[Dict[str, Any]]:
-    """Fetch LLDP neighbors for specific interface using correct AOS-CX API structure."""
-    encoded_name = interface_name.replace('/', '%2F')
+    """Fetch LLDP neighbors for specific interface using correct AOS-CX API structure.
+    
+    Neighbors are requested with depth=2 so their details come back inline;
+    a per-neighbor GET is only made if the switch still returns URLs.
+    """
+    base = direct_rest_manager.base_url(switch_ip)
+    encoded_name = _url_key(interface_name)
     neighbors = []
     
+    def neighbor_info(neighbor_data: Dict[str, Any]) -> Dict[str, Any]:
+        # Extract meaningful neighbor information
+        return {
+            'chassis_id': neighbor_data.get('chassis_id', ''),
+            'port_id': neighbor_data.get('port_id', ''),
+            'system_name': neighbor_data.get('system_name', ''),
+            'system_description': neighbor_data.get('system_description', ''),
+            'port_description': neighbor_data.get('port_description', '')
+        }
+    
     try:
-        # Get LLDP neighbors list first
-        lldp_neighbors_url = f"https://{switch_ip}/rest/v10.09/system/interfaces/{encoded_name}/lldp_neighbors"
-        lldp_response = session_obj.get(lldp_neighbors_url, timeout=5, verify=Config.SSL_VERIFY)
-        api_logger.log_api_call('GET', lldp_neighbors_url, {}, None, lldp_response.status_code, lldp_response.text, 0)
-        
-        if lldp_response.status_code == 200:
-            neighbors_list = lldp_response.json()
-            
-            # neighbors_list is a dict with neighbor keys like "98:8f:00:c7:55:4f,98:8f:00:c7:55:4f"
-            if isinstance(neighbors_list, dict):
-                for neighbor_key, neighbor_url in neighbors_list.items():
-                    try:
-                        # Extract the encoded neighbor key from the URL path
-                        encoded_neighbor_key = neighbor_key.replace(':', '%3A').replace(',', ',')
-                        neighbor_detail_url = f"https://{switch_ip}/rest/v10.09/system/interfaces/{encoded_name}/lldp_neighbors/{encoded_neighbor_key}"
-                        
-                        neighbor_response = session_obj.get(neighbor_detail_url, timeout=3, verify=Config.SSL_VERIFY)
-                        api_logger.log_api_call('GET', neighbor_detail_url, {}, None, neighbor_response.status_code, neighbor_response.text, 0)
+        # Get LLDP neighbors with their details inlined
+        lldp_neighbors_url = f"{base}/system/interfaces/{encoded_name}/lldp_neighbors?depth=2"
+        neighbors_list = _get_json(switch_ip, session_obj, lldp_neighbors_url, timeout=5)
+        
+        # neighbors_list is a dict with neighbor keys like "98:8f:00:c7:55:4f,98:8f:00:c7:55:4f"
+        if isinstance(neighbors_list, dict):
+            for neighbor_key, neighbor_value in neighbors_list.items():
+                if isinstance(neighbor_value, dict):
+                    neighbors.append(neighbor_info(neighbor_value))
+                    continue
+                
+                # Fallback: value is a URL, fetch the neighbor individually
+                try:
+                    encoded_neighbor_key = _url_key(neighbor_key)
+                    neighbor_detail_url = f"{base}/system/interfaces/{encoded_name}/lldp_neighbors/{encoded_neighbor_key}"
+                    
+                    neighbor_response = session_obj.get(neighbor_detail_url, timeout=3, verify=Config.SSL_VERIFY)
+                    api_logger.log_api_call('GET', neighbor_detail_url, {}, None, neighbor_response.status_code, neighbor_response.content, 0, switch_ip)
+                    
+                    if neighbor_response.status_code == 200:
+                        neighbors.append(neighbor_info(json_codec.loads(neighbor_response.content)))
+                    else:
+                        logger.debug(f"Failed to get LLDP neighbor detail for {neighbor_key}: {neighbor_response.status_code}")
                         
-                        if neighbor_response.status_code == 200:
-                            neighbor_data = neighbor_response.json()
-                            
-                            # Extract meaningful neighbor information
-                            neighbor_info = {
-                                'chassis_id': neighbor_data.get('chassis_id', ''),
-                                'port_id': neighbor_data.get('port_id', ''),
-                                'system_name': neighbor_data.get('system_name', ''),
-                                'system_description': neighbor_data.get('system_description', ''),
-                                'port_description': neighbor_data.get('port_description', '')
-                            }
-                            
-                            neighbors.append(neighbor_info)
-                        else:
-                            logger.debug(f"Failed to get LLDP neighbor detail for {neighbor_key}: {neighbor_response.status_code}")
-                            
-                    except Exception as neighbor_error:
-                        logger.debug(f"Error processing LLDP neighbor {neighbor_key}: {neighbor_error}")
-                        continue
+                except Exception as neighbor_error:
+                    logger.debug(f"Error processing LLDP neighbor {neighbor_key}: {neighbor_error}")
+                    continue
         else:
-            logger.debug(f"LLDP neighbors endpoint returned {lldp_response.status_code} for {interface_name}")
+            logger.debug(f"LLDP neighbors endpoint returned no data for {interface_name}")
             
     except Exception as e:
         logger.debug(f"LLDP neighbors fetch failed for {interface_name}: {e}")
@@ -493,6 +696,68 @@ def _calculate_vlan_membership(interfaces: List[Dict[str, Any]]) -> Dict[int, Di
     
     return membership
 
+def _get_or_auth(switch_ip: str):
+    """Return an authenticated session, retrying once after a session cleanup.
+
+    A session is reused for SESSION_REUSE_TTL seconds as long as the REST
+    manager still tracks it, skipping the validity probe on every call.
+    """
+    session_obj = _session_cache.get(switch_ip)
+    if session_obj is not None and direct_rest_manager.sessions.get(switch_ip) is session_obj:
+        return session_obj
+
+    for attempt in range(2):
+        try:
+            session_obj = direct_rest_manager._authenticate(switch_ip)
+            logger.info(f"Authentication successful for {switch_ip} on attempt {attempt + 1}")
+            break
+        except Exception as auth_error:
+            logger.warning(f"Auth attempt {attempt + 1} failed for {switch_ip}: {auth_error}")
+            if attempt == 0:
+                # First attempt failed, clean up sessions and retry
+                logger.info(f"Cleaning up sessions for {switch_ip} before retry")
+                direct_rest_manager.cleanup_session(switch_ip)
+                time.sleep(1)  # Brief delay before retry
+            else:
+                logger.error(f"Authentication failed after 2 attempts for {switch_ip}")
+                raise SwitchConnectionError(
+                    f'Authentication failed: {str(auth_error)}',
+                    'authentication_failed',
+                    switch_ip=switch_ip
+                ) from auth_error
+
+    _session_cache.set(switch_ip, session_obj, ttl=_session_reuse_ttl(session_obj))
+    return session_obj
+
+def _session_reuse_ttl(session_obj) -> float:
+    """Reuse a session for SESSION_REUSE_TTL, but never past its earliest cookie expiry."""
+    ttl = SESSION_REUSE_TTL
+    now = time.time()
+    for cookie in session_obj.cookies:
+        if cookie.expires:
+            ttl = min(ttl, max(0, cookie.expires - now))
+    return ttl
+
+def _json_response(payload: Any, status: int = 200):
+    """Build a JSON response using the fast encoder for large list payloads."""
+    return app.response_class(json_codec.dumps(payload), status=status, mimetype='application/json')
+
+def with_session(route_fn):
+    """Route decorator that passes an authenticated session after switch_ip.
+
+    Authentication failures are logged and answered with a 401.
+    """
+    @wraps(route_fn)
+    def wrapper(switch_ip: str, **kwargs):
+        try:
+            session_obj = _get_or_auth(switch_ip)
+        except SwitchConnectionError as e:
+            error_response = {'error': str(e)}
+            api_logger.log_api_call(request.method, request.path, {}, None, 401, str(error_response), 0, switch_ip)
+            return jsonify(error_response), 401
+        return route_fn(switch_ip, session_obj, **kwargs)
+    return wrapper
+
 # Initialize Flask application
 app = Flask(__name__)
 # Ensure correct scheme/host when running behind reverse proxies
@@ -513,6 +778,26 @@ for switch_ip in Config.DEFAULT_SWITCHES:
     inventory.add_switch(switch_ip)
     logger.info(f"Added default switch: {switch_ip}")
 
+def _warm_switch(switch_ip: str) -> None:
+    """Populate the capability and interface caches for one switch."""
+    try:
+        session_obj = _get_or_auth(switch_ip)
+    except SwitchConnectionError as e:
+        logger.warning(f"Cache warm-up skipped for {switch_ip}: {e}")
+        return
+    capabilities_for(switch_ip, session_obj)
+    get_cached_interfaces(switch_ip, session_obj)
+
+def _warm_default_switches() -> None:
+    """Warm caches for the default switches so the first dashboard load reads from memory."""
+    # Warmers wait on the shared I/O pool, so they get their own bounded pool
+    with ThreadPoolExecutor(max_workers=16, thread_name_prefix='warmup') as executor:
+        list(executor.map(_warm_switch, Config.DEFAULT_SWITCHES))
+    logger.info(f"Cache warm-up finished for {len(Config.DEFAULT_SWITCHES)} default switches")
+
+if Config.DEFAULT_SWITCHES:
+    threading.Thread(target=_warm_default_switches, name='cache-warmup', daemon=True).start()
+
 @app.route('/')
 def dashboard():
     """Launch to the mobile UI by default; desktop only when explicitly requested."""
@@ -542,7 +827,7 @@ def healthz():
 def get_switches():
     """Get all switches in inventory."""
     switches = [switch.to_dict() for switch in inventory.get_all_switches()]
-    return jsonify({
+    return _json_response({
         'switches': switches,
         'count': inventory.get_switch_count()
     })
@@ -649,11 +934,13 @@ def add_direct_switch(data):
                 ('admin', None)
             ]
             
+            # Probed one at a time in list order: each successful login opens
+            # a switch session, and the first working credential is the one stored
             for try_username, try_password in default_credentials:
                 try:
-                    logger.info(f"Trying default credential {try_username}/{try_password or '(blank)'} for {ip_address}")
+                    logger.info("Trying default credential %s/%s for %s", try_username, try_password or '(blank)', ip_address)
                     result = direct_rest_manager.test_connection_with_credentials(ip_address, try_username, try_password)
-                    logger.info(f"Default credential test result for {ip_address}: status={result.get('status')}")
+                    logger.info("Default credential test result for %s: status=%s", ip_address, result.get('status'))
                     if result.get('status') == 'online':
                         success = True
                         credentials_used = f"default:{try_username}/{try_password if try_password else '(blank)'}"
@@ -661,7 +948,7 @@ def add_direct_switch(data):
                         inventory.store_credentials(ip_address, try_username, try_password)
                         break
                 except Exception as e:
-                    logger.info(f"Default credential {try_username}/{try_password or '(blank)'} failed for {ip_address}: {e}")
+                    logger.info("Default credential %s/%s failed for %s: %s", try_username, try_password or '(blank)', ip_address, e)
                     continue
         
         if not success:
@@ -678,8 +965,8 @@ def add_direct_switch(data):
         
         if success:
             # Add to inventory
-            if inventory.add_switch(ip_address, name):
-                switch_info = inventory.get_switch(ip_address)
+            switch_info = inventory.add_switch(ip_address, name)
+            if switch_info:
                 logger.info(f"Successfully added switch: {ip_address} using {credentials_used}")
                 # Immediately retrieve device data to enrich cache and UI
                 try:
@@ -734,28 +1021,22 @@ def add_central_switch(data):
         return jsonify({'error': f'Central device {device_serial} already exists'}), 400
     
     try:
-        # Test Central connection
-        if inventory.add_central_switch(device_serial, name, client_id, client_secret, customer_id, base_url):
-            switch_info = inventory.get_switch(switch_key)
-            
-            # Test the Central connection
-            result = switch_manager_factory.test_connection(switch_info)
-            
-            if result.get('status') == 'online':
-                logger.info(f"Added new Central switch: {device_serial}")
-                return jsonify({
-                    'message': f'Central device {device_serial} added successfully',
-                    'switch': switch_info.to_dict()
-                })
-            else:
-                # Remove from inventory if connection test failed
-                inventory.remove_switch(switch_key)
-                return jsonify({
-                    'error': f'Failed to connect to Central device: {result.get("error_message", "Unknown error")}',
-                    'error_type': 'central_connection_failed'
-                }), 401
+        # Test the Central connection before the device is added to the inventory
+        switch_info = inventory.make_central_switch(device_serial, name, client_id, client_secret, customer_id, base_url)
+        result = switch_manager_factory.test_connection(switch_info)
+        
+        if result.get('status') == 'online':
+            inventory.add_switch_info(switch_info)
+            logger.info(f"Added new Central switch: {device_serial}")
+            return jsonify({
+                'message': f'Central device {device_serial} added successfully',
+                'switch': switch_info.to_dict()
+            })
         else:
-            return jsonify({'error': 'Failed to add Central device to inventory'}), 500
+            return jsonify({
+                'error': f'Failed to connect to Central device: {result.get("error_message", "Unknown error")}',
+                'error_type': 'central_connection_failed'
+            }), 401
             
     except Exception as e:
         logger.error(f"Error adding Central switch {device_serial}: {e}")
@@ -764,13 +1045,13 @@ def add_central_switch(data):
 @app.route('/api/switches/<switch_ip>', methods=['DELETE'])
 def remove_switch(switch_ip: str):
     """Remove a switch from inventory."""
-    if not inventory.get_switch(switch_ip):
+    if not inventory.remove_switch(switch_ip):
         return jsonify({'error': f'Switch {switch_ip} not found'}), 404
     
-    if inventory.remove_switch(switch_ip):
-        return jsonify({'message': f'Switch {switch_ip} removed successfully'})
-    else:
-        return jsonify({'error': 'Failed to remove switch'}), 500
+    invalidate_switch_cache(switch_ip)
+    capability_cache.invalidate(switch_ip)
+    inventory.remove_credentials(switch_ip)
+    return jsonify({'message': f'Switch {switch_ip} removed successfully'})
 
 @app.route('/api/switches/<switch_ip>/test', methods=['GET'])
 def test_switch_connection(switch_ip: str):
@@ -863,6 +1144,7 @@ def create_vlan():
     
     try:
         message = switch_manager_factory.create_vlan(switch_info, vlan_id, name)
+        invalidate_switch_tags(switch_ip, 'vlan_write')
         logger.info(f"VLAN creation request: {switch_ip} - VLAN {vlan_id} ({name})")
         return jsonify({
             'status': 'success',
@@ -906,6 +1188,7 @@ def delete_vlan():
     
     try:
         message = switch_manager_factory.delete_vlan(switch_info, vlan_id)
+        invalidate_switch_tags(switch_ip, 'vlan_write')
         logger.info(f"VLAN deletion request: {switch_ip} - VLAN {vlan_id}")
         return jsonify({
             'status': 'success',
@@ -931,16 +1214,13 @@ def bulk_create_vlans():
     if not vlans:
         return jsonify({'error': 'vlans list is required'}), 400
     
-    results = []
-    
-    for switch_ip in switch_ips:
+    def create_on_switch(switch_ip: str) -> Dict[str, Any]:
         if not inventory.get_switch(switch_ip):
-            results.append({
+            return {
                 'switch_ip': switch_ip,
                 'status': 'error',
                 'message': f'Switch {switch_ip} not found in inventory'
-            })
-            continue
+            }
         
         switch_results = []
         for vlan_data in vlans:
@@ -970,10 +1250,16 @@ def bulk_create_vlans():
                     'message': str(e)
                 })
         
-        results.append({
+        if any(r['status'] == 'success' for r in switch_results):
+            invalidate_switch_tags(switch_ip, 'vlan_write')
+        return {
             'switch_ip': switch_ip,
             'vlans': switch_results
-        })
+        }
+    
+    # Switches are independent, so a few are worked on in parallel; VLANs on a
+    # single switch still go one at a time and in order
+    results = _fan_out(create_on_switch, switch_ips, limit=Config.SWITCH_FETCH_CONCURRENCY)
     
     return jsonify({'results': results})
 
@@ -984,7 +1270,7 @@ def get_system_status():
     switch_counts = inventory.get_switch_count()
     online_switches = inventory.get_online_switches()
     
-    return jsonify({
+    return _json_response({
         'switches': switch_counts,
         'online_switches': [switch.to_dict() for switch in online_switches],
         'timestamp': inventory.get_all_switches()[0].last_seen.isoformat() if online_switches else None
@@ -1005,7 +1291,7 @@ def export_configuration():
         }
     }
     
-    return jsonify(config_export)
+    return _json_response(config_export)
 
 @app.route('/api/config/import', methods=['POST'])
 def import_configuration():
@@ -1054,6 +1340,10 @@ def cleanup_switch_sessions(switch_ip: str):
     try:
         logger.info(f"Attempting session cleanup for {switch_ip}")
         success = direct_rest_manager.attempt_session_cleanup(switch_ip)
+        # Cached sessions and data may belong to the sessions just cleared
+        _session_cache.invalidate(switch_ip)
+        invalidate_switch_cache(switch_ip)
+        capability_cache.invalidate(switch_ip)
         
         if success:
             return jsonify({
@@ -1108,7 +1398,7 @@ def get_api_call_logs():
         )
         stats = api_logger.get_call_statistics()
         
-        return jsonify({
+        return _json_response({
             'calls': calls,
             'statistics': stats,
             'total_returned': len(calls)
@@ -1140,15 +1430,13 @@ def export_api_logs():
         if format_type not in ['json', 'csv']:
             return jsonify({'error': 'Supported formats: json, csv'}), 400
             
-        exported_data = api_logger.export_logs(format_type)
-        
         # Set appropriate content type and filename
         if format_type == 'csv':
-            response = make_response(exported_data)
-            response.headers['Content-Type'] = 'text/csv'
+            # Stream rows as they are written instead of building the whole file first
+            response = app.response_class(api_logger.iter_csv(), mimetype='text/csv')
             response.headers['Content-Disposition'] = 'attachment; filename=api_logs.csv'
         else:
-            response = make_response(exported_data)
+            response = make_response(api_logger.export_logs(format_type))
             response.headers['Content-Type'] = 'application/json'
             response.headers['Content-Disposition'] = 'attachment; filename=api_logs.json'
             
@@ -1157,35 +1445,73 @@ def export_api_logs():
         logger.error(f"Error exporting API logs: {e}")
         return jsonify({'error': f'Error exporting logs: {str(e)}'}), 500
 
+# Status classification tables shared by normalize_status / get_human_readable_status.
+# Switch fault and warning enums either carry a marker prefix (e.g. "fault__input")
+# or are one of a few exact names.
+_OK_SET = frozenset({"ok", "good", "normal", "up", "online", "operational", "active", "running",
+                     "ready", "present", "enabled"})
+_OK_UPPER_SET = frozenset({"OK", "GOOD", "NORMAL", "UP", "ONLINE", "OPERATIONAL", "ACTIVE", "RUNNING"})
+_FAULT_PREFIXES = ("fault_", "error_")
+_FAULT_EXACT = frozenset({"failed", "critical"})
+_WARN_PREFIXES = ("warning_", "alert_")
+_WARN_EXACT = frozenset({"degraded"})
+
 def normalize_status(raw_status: str) -> str:
     """Normalize raw status strings to consistent values."""
     if not raw_status:
         return "unknown"
+    # Switches occasionally report non-string values; coerce before the memoized lookup
+    return _normalize_status(str(raw_status))
+
+@lru_cache(maxsize=128)
+def _normalize_status(raw_status: str) -> str:
+    status_lower = raw_status.lower().strip()
     
-    status_lower = str(raw_status).lower().strip()
-    
-    # Map specific known good statuses first (more specific)
-    if status_lower in ["ok", "good", "normal", "up", "online", "operational", "active", "running"]:
+    # None of the OK names contain a fault/warning marker, so the set can be checked first
+    if status_lower in _OK_SET:
         return "ok"
-    # Map specific fault patterns (be more specific about faults)
-    elif any(fault in status_lower for fault in ["fault_", "error_", "failed", "critical"]):
+    if status_lower in _FAULT_EXACT or status_lower.startswith(_FAULT_PREFIXES):
         return "error"
-    elif any(warn in status_lower for warn in ["warning_", "alert_", "degraded"]):
+    if status_lower in _WARN_EXACT or status_lower.startswith(_WARN_PREFIXES):
         return "warning"
-    # If we just get a simple status without underscore, it's likely OK
-    elif status_lower in ["normal", "ready", "present", "enabled"]:
-        return "ok"
-    else:
-        # Default to unknown for unrecognized statuses rather than assuming error
-        return "unknown"
+    # Default to unknown for unrecognized statuses rather than assuming error
+    return "unknown"
+
+# Severity order used when rolling component statuses up into one
+_STATUS_RANK = {"ok": 0, "unknown": 1, "warning": 2, "error": 3}
+
+def aggregate_status(statuses) -> str:
+    """Return the worst of the given normalized statuses ("ok" when empty)."""
+    worst = "ok"
+    for status in statuses:
+        if status == "error":
+            return "error"
+        if status not in _STATUS_RANK:
+            status = "unknown"
+        if _STATUS_RANK[status] > _STATUS_RANK[worst]:
+            worst = status
+    return worst
+
+def split_by_status(items) -> tuple:
+    """Return (errors, warnings): the items whose 'status' is error or warning, in one pass."""
+    errors, warnings = [], []
+    for item in items:
+        if item['status'] == 'error':
+            errors.append(item)
+        elif item['status'] == 'warning':
+            warnings.append(item)
+    return errors, warnings
 
 def get_human_readable_status(raw_status: str) -> str:
     """Convert raw status enums to human-readable labels."""
     if not raw_status:
         return "Unknown"
-    
+    return _human_readable_status(str(raw_status))
+
+@lru_cache(maxsize=128)
+def _human_readable_status(raw_status: str) -> str:
     # Handle specific fault patterns with descriptive labels
-    status_upper = str(raw_status).upper().strip()
+    status_upper = raw_status.upper().strip()
     
     if status_upper == "FAULT__INPUT":
         return "Input fault"
@@ -1195,11 +1521,25 @@ def get_human_readable_status(raw_status: str) -> str:
     elif status_upper.startswith("WARNING__"):
         warning_type = status_upper.replace("WARNING__", "").replace("_", " ").lower()
         return f"{warning_type.capitalize()} warning"
-    elif status_upper in ["OK", "GOOD", "NORMAL", "UP", "ONLINE", "OPERATIONAL", "ACTIVE", "RUNNING"]:
+    elif status_upper in _OK_UPPER_SET:
         return "OK"
     else:
         return raw_status.replace("_", " ").title()
 
+# Top-level CPU fields checked in order before scanning nested objects
+_CPU_DIRECT_FIELDS = ('cpu_utilization', 'utilization', 'usage_percent', 'cpu_usage')
+
+# Utilization thresholds as (exclusive lower bound, status), highest first
+_CPU_SEVERITY_BANDS = ((90, "error"), (75, "warning"))
+_POE_SEVERITY_BANDS = ((95, "warning"),)  # near capacity
+
+def classify_percentage(percentage: float, bands: tuple) -> str:
+    """Return the status of the first band the percentage exceeds, otherwise "ok"."""
+    for threshold, status in bands:
+        if percentage > threshold:
+            return status
+    return "ok"
+
 def get_cpu_usage(switch_ip: str, session_obj, capabilities: Dict[str, Any]) -> tuple:
     """Get CPU usage percentage and status."""
     if not capabilities.get('cpu_supported', False):
@@ -1207,32 +1547,34 @@ def get_cpu_usage(switch_ip: str, session_obj, capabilities: Dict[str, Any]) ->
     
     # Use the discovered CPU endpoint if available
     cpu_endpoint = capabilities.get('cpu_endpoint')
-    if not cpu_endpoint:
+    if not cpu_endpoint or _cpu_disabled.get(switch_ip):
         return None, "na"
     
     try:
-        cpu_response = session_obj.get(cpu_endpoint, timeout=5, verify=Config.SSL_VERIFY)
-        api_logger.log_api_call('GET', cpu_endpoint, {}, None, cpu_response.status_code, cpu_response.text, 0)
+        cpu_data = _get_json(switch_ip, session_obj, cpu_endpoint, timeout=CPU_REQUEST_TIMEOUT)
         
-        if cpu_response.status_code == 200:
-            cpu_data = cpu_response.json()
+        if cpu_data is None:
+            _record_cpu_failure(switch_ip)
+        else:
+            _cpu_failures.invalidate(switch_ip)
             
             # Try to extract CPU percentage from various possible fields
             cpu_percentage = None
             
             # Try direct fields first
-            for field in ['cpu_utilization', 'utilization', 'usage_percent', 'cpu_usage']:
+            for field in _CPU_DIRECT_FIELDS:
                 if field in cpu_data:
                     cpu_percentage = cpu_data[field]
                     break
             
             # If not found, look deeper in nested structures
             if cpu_percentage is None and isinstance(cpu_data, dict):
-                for key, value in cpu_data.items():
+                for value in cpu_data.values():
                     if isinstance(value, dict):
                         for subkey, subvalue in value.items():
-                            if any(cpu_key in subkey.lower() for cpu_key in ['cpu', 'utilization']):
-                                if isinstance(subvalue, (int, float)):
+                            if isinstance(subvalue, (int, float)):
+                                low = subkey.lower()
+                                if 'cpu' in low or 'utilization' in low:
                                     cpu_percentage = subvalue
                                     break
                         if cpu_percentage is not None:
@@ -1240,229 +1582,236 @@ def get_cpu_usage(switch_ip: str, session_obj, capabilities: Dict[str, Any]) ->
             
             if cpu_percentage is not None:
                 cpu_percentage = int(float(cpu_percentage))
-                if cpu_percentage > 90:
-                    return cpu_percentage, "error"
-                elif cpu_percentage > 75:
-                    return cpu_percentage, "warning"
-                else:
-                    return cpu_percentage, "ok"
+                return cpu_percentage, classify_percentage(cpu_percentage, _CPU_SEVERITY_BANDS)
                     
     except Exception as e:
         logger.debug(f"Error getting CPU usage for {switch_ip}: {e}")
+        _record_cpu_failure(switch_ip)
     
     return None, "na"
 
+def _record_cpu_failure(switch_ip: str):
+    """Count a failed CPU poll; after CPU_MAX_FAILURES in a row, stop polling the switch for a while."""
+    failures = (_cpu_failures.get(switch_ip) or 0) + 1
+    if failures >= CPU_MAX_FAILURES:
+        _cpu_failures.invalidate(switch_ip)
+        _cpu_disabled.set(switch_ip, True)
+        logger.info(f"CPU endpoint failing on {switch_ip}; skipping CPU polling for {_cpu_disabled.default_ttl}s")
+    else:
+        _cpu_failures.set(switch_ip, failures)
+
 @app.route('/api/switches/<switch_ip>/overview')
 def get_switch_overview(switch_ip: str):
     """Get real switch overview data including model, ports, PoE, power, fans, CPU (cached)."""
     def fetch_overview():
         # Inner function contains the existing logic; used for caching
-        # Two-attempt authentication with session cleanup on failure
-        session_obj = None
-        
-        for attempt in range(2):
-            try:
-                session_obj = direct_rest_manager._authenticate(switch_ip)
-                logger.info(f"Authentication successful for {switch_ip} on attempt {attempt + 1}")
-                break
-            except Exception as auth_error:
-                logger.warning(f"Auth attempt {attempt + 1} failed for {switch_ip}: {auth_error}")
-                if attempt == 0:
-                    # First attempt failed, clean up sessions and retry
-                    logger.info(f"Cleaning up sessions for {switch_ip} before retry")
-                    direct_rest_manager.cleanup_session(switch_ip)
-                    time.sleep(1)  # Brief delay before retry
-                else:
-                    # Second attempt failed, give up
-                    logger.error(f"Authentication failed after 2 attempts for {switch_ip}")
-                    raise Exception(f'Authentication failed: {str(auth_error)}')
-        
-        if not session_obj:
-            raise Exception('Failed to authenticate to switch')
+        base = direct_rest_manager.base_url(switch_ip)
+        session_obj = _get_or_auth(switch_ip)
         
         # Get switch capabilities (reuse existing session)
         capabilities = capabilities_for(switch_ip, session_obj)
         
         # Get system information  
         system_response = session_obj.get(
-            f"https://{switch_ip}/rest/v10.09/system",
+            f"{base}/system",
             timeout=10,
             verify=Config.SSL_VERIFY
         )
         
         if system_response.status_code != 200:
-            return jsonify({'error': f'Failed to get system information: {system_response.status_code}'}), 500
+            # Raise rather than return so the failure is never cached as an overview
+            raise Exception(f'Failed to get system information: {system_response.status_code}')
             
-        system_data = system_response.json()
-        api_logger.log_api_call('GET', f"https://{switch_ip}/rest/v10.09/system", {}, None, system_response.status_code, system_response.text, 0)
+        system_data = json_codec.loads(system_response.content)
+        api_logger.log_api_call('GET', f"{base}/system", {}, None, system_response.status_code, system_response.content, 0, switch_ip)
+        
+        # Cached capabilities are only valid for the firmware they were detected on
+        firmware_version = system_data.get('firmware_version', '')
+        detected_firmware = capabilities.get('firmware_version')
+        if firmware_version and detected_firmware and detected_firmware != firmware_version:
+            logger.info("Firmware on %s is %s; re-detecting capabilities", switch_ip, firmware_version)
+            capability_cache.invalidate(switch_ip)
+            capabilities = capabilities_for(switch_ip, session_obj)
         
-        # Get power supplies status and health info
-        power_status = "unknown"
-        power_supplies_info = []
         expected_psu_slots = capabilities.get('expected_psu_slots', 1)
         
-        try:
-            power_url = f"https://{switch_ip}/rest/v10.09/system/subsystems/chassis,1/power_supplies"
-            power_response = session_obj.get(power_url, timeout=5, verify=Config.SSL_VERIFY)
-            api_logger.log_api_call('GET', power_url, {}, None, power_response.status_code, power_response.text, 0)
+        def psu_entry(psu_key: str, ps_data: Dict[str, Any]) -> Dict[str, Any]:
+            raw_status = ps_data.get('status', 'unknown')
+            raw_input_status = ps_data.get('input_status', 'unknown')
+            normalized_status = normalize_status(raw_status)
+            normalized_input_status = normalize_status(raw_input_status)
+        
+            # Create detailed PSU info with proper error messages
+            psu_detail = {
+                'id': psu_key,
+                'bay_label': f"PSU {psu_key.split('/')[-1]}" if '/' in psu_key else f"PSU {psu_key}",
+                'status': normalized_status,
+                'input_status': normalized_input_status
+            }
+        
+            return {
+                'slot': psu_key,
+                'status': normalized_status,
+                'raw_status': raw_status,
+                'detail': psu_detail
+            }
+        
+        def power_section(chassis_data: Optional[Dict[str, Any]]):
+            # Power supplies status and health info
+            power_status = "unknown"
+            power_supplies_info = []
+        
+            try:
+                if chassis_data is not None:
+                    power_supplies = chassis_data.get('power_supplies') or {}
+                else:
+                    # Expanded chassis query failed; list the power supplies on their own
+                    power_supplies = _get_json(switch_ip, session_obj, f"{base}/system/subsystems/chassis,1/power_supplies")
             
-            if power_response.status_code == 200:
-                power_supplies = power_response.json()
                 if power_supplies:
-                    psu_statuses = []
-                    for psu_key in power_supplies.keys():
-                        try:
-                            ps_url = f"https://{switch_ip}/rest/v10.09/system/subsystems/chassis,1/power_supplies/{psu_key.replace('/', '%2F')}"
-                            ps_response = session_obj.get(ps_url, timeout=5, verify=Config.SSL_VERIFY)
-                            api_logger.log_api_call('GET', ps_url, {}, None, ps_response.status_code, ps_response.text, 0)
-                            
-                            if ps_response.status_code == 200:
-                                ps_data = ps_response.json()
-                                raw_status = ps_data.get('status', 'unknown')
-                                raw_input_status = ps_data.get('input_status', 'unknown')
-                                normalized_status = normalize_status(raw_status)
-                                normalized_input_status = normalize_status(raw_input_status)
-                                psu_statuses.append(normalized_status)
-                                
-                                # Create detailed PSU info with proper error messages
-                                psu_detail = {
-                                    'id': psu_key,
-                                    'bay_label': f"PSU {psu_key.split('/')[-1]}" if '/' in psu_key else f"PSU {psu_key}",
-                                    'status': normalized_status,
-                                    'input_status': normalized_input_status
-                                }
-                                
-                                power_supplies_info.append({
-                                    'slot': psu_key,
-                                    'status': normalized_status,
-                                    'raw_status': raw_status,
-                                    'detail': psu_detail
-                                })
-                        except Exception as e:
-                            logger.debug(f"Error getting PSU {psu_key} status: {e}")
-                    
-                    # Determine overall power status
-                    if any(status == "error" for status in psu_statuses):
-                        power_status = "error"
-                    elif any(status == "warning" for status in psu_statuses):
-                        power_status = "warning"
-                    elif all(status == "ok" for status in psu_statuses):
-                        power_status = "ok"
+                    if all(isinstance(ps_data, dict) for ps_data in power_supplies.values()):
+                        # Expanded response already carries each bay's status
+                        power_supplies_info = [psu_entry(psu_key, ps_data) for psu_key, ps_data in power_supplies.items()]
                     else:
-                        power_status = "unknown"
-        except Exception as e:
-            logger.debug(f"Error getting power status: {e}")
+                        def fetch_psu(psu_key: str) -> Optional[Dict[str, Any]]:
+                            try:
+                                ps_data = _get_json(switch_ip, session_obj, f"{base}/system/subsystems/chassis,1/power_supplies/{_url_key(psu_key)}")
+                                if ps_data is not None:
+                                    return psu_entry(psu_key, ps_data)
+                            except Exception as e:
+                                logger.debug("Error getting PSU %s status: %s", psu_key, e)
+                            return None
+                    
+                        # Query all bays at once; results keep the listing order
+                        psu_keys = list(power_supplies.keys())
+                        power_supplies_info = [psu for psu in _fan_out(fetch_psu, psu_keys, limit=8) if psu]
+                    power_status = aggregate_status(psu['status'] for psu in power_supplies_info)
+            except Exception as e:
+                logger.debug("Error getting power status: %s", e)
+            return power_status, power_supplies_info
+        
+        def fetch_chassis() -> Optional[Dict[str, Any]]:
+            # Power supplies, fans and PoE power all live under chassis,1, so one expanded GET serves them all
+            try:
+                chassis_url = f"{base}/system/subsystems/chassis,1?depth=2&attributes={_CHASSIS_ATTRIBUTES}"
+                status_code, chassis_data = _get_json_conditional(switch_ip, session_obj, chassis_url, timeout=5)
+                if status_code == 200 and isinstance(chassis_data, dict):
+                    return chassis_data
+            except Exception as e:
+                logger.debug("Error getting chassis data: %s", e)
+            return None
         
-        # Get fan status
-        fan_status = "unknown"
-        fans_info = []
+        def fan_entry(fan_key: str, fan_data: Dict[str, Any]) -> Dict[str, Any]:
+            raw_status = fan_data.get('status', 'unknown')
+            return {
+                'slot': fan_key,
+                'status': normalize_status(raw_status),
+                'raw_status': raw_status
+            }
         
-        try:
-            fans_url = f"https://{switch_ip}/rest/v10.09/system/subsystems/chassis,1/fans"
-            fans_response = session_obj.get(fans_url, timeout=5, verify=Config.SSL_VERIFY)
-            api_logger.log_api_call('GET', fans_url, {}, None, fans_response.status_code, fans_response.text, 0)
+        def fan_section(chassis_data: Optional[Dict[str, Any]]):
+            # Fan status
+            fan_status = "unknown"
+            fans_info = []
+        
+            try:
+                if chassis_data is not None:
+                    fans = chassis_data.get('fans') or {}
+                else:
+                    # Expanded chassis query failed; list the fans on their own
+                    fans = _get_json(switch_ip, session_obj, f"{base}/system/subsystems/chassis,1/fans")
             
-            if fans_response.status_code == 200:
-                fans = fans_response.json()
                 if fans:
-                    fan_statuses = []
-                    for fan_key in fans.keys():
-                        try:
-                            fan_url = f"https://{switch_ip}/rest/v10.09/system/subsystems/chassis,1/fans/{fan_key.replace('/', '%2F')}"
-                            fan_response = session_obj.get(fan_url, timeout=5, verify=Config.SSL_VERIFY)
-                            api_logger.log_api_call('GET', fan_url, {}, None, fan_response.status_code, fan_response.text, 0)
-                            
-                            if fan_response.status_code == 200:
-                                fan_data = fan_response.json()
-                                raw_status = fan_data.get('status', 'unknown')
-                                normalized_status = normalize_status(raw_status)
-                                fan_statuses.append(normalized_status)
-                                fans_info.append({
-                                    'slot': fan_key,
-                                    'status': normalized_status,
-                                    'raw_status': raw_status
-                                })
-                        except Exception as e:
-                            logger.debug(f"Error getting fan {fan_key} status: {e}")
-                    
-                    # Determine overall fan status
-                    if any(status == "error" for status in fan_statuses):
-                        fan_status = "error"
-                    elif any(status == "warning" for status in fan_statuses):
-                        fan_status = "warning"
-                    elif all(status == "ok" for status in fan_statuses):
-                        fan_status = "ok"
+                    if all(isinstance(fan_data, dict) for fan_data in fans.values()):
+                        # Expanded response already carries each fan's status
+                        fans_info = [fan_entry(fan_key, fan_data) for fan_key, fan_data in fans.items()]
                     else:
-                        fan_status = "unknown"
-        except Exception as e:
-            logger.debug(f"Error getting fan status: {e}")
-            
-        # Get interface count (to determine port count)
-        port_count = "unknown"
-        try:
-            interfaces_url = f"https://{switch_ip}/rest/v10.09/system/interfaces"
-            interfaces_response = session_obj.get(interfaces_url, timeout=10, verify=Config.SSL_VERIFY)
-            api_logger.log_api_call('GET', interfaces_url, {}, None, interfaces_response.status_code, interfaces_response.text, 0)
-            
-            if interfaces_response.status_code == 200:
-                interfaces = interfaces_response.json()
-                # Count physical interfaces (excluding sub-interfaces)
-                physical_ports = [iface for iface in interfaces.keys() if ':' not in iface and iface.startswith('1/1/')]
-                port_count = str(len(physical_ports))
-        except Exception as e:
-            logger.debug(f"Error getting interface count: {e}")
-        
-        # Get CPU usage using capabilities
-        cpu_usage, cpu_status = get_cpu_usage(switch_ip, session_obj, capabilities)
+                        def fetch_fan(fan_key: str) -> Optional[Dict[str, Any]]:
+                            try:
+                                fan_data = _get_json(switch_ip, session_obj, f"{base}/system/subsystems/chassis,1/fans/{_url_key(fan_key)}")
+                                if fan_data is not None:
+                                    return fan_entry(fan_key, fan_data)
+                            except Exception as e:
+                                logger.debug("Error getting fan %s status: %s", fan_key, e)
+                            return None
+                    
+                        # Query all fans at once; results keep the listing order
+                        fans_info = [fan for fan in _fan_out(fetch_fan, list(fans.keys()), limit=8) if fan]
+                    fan_status = aggregate_status(fan['status'] for fan in fans_info)
+            except Exception as e:
+                logger.debug("Error getting fan status: %s", e)
+            return fan_status, fans_info
         
-        # Get PoE status from chassis subsystem data
-        poe_status = "N/A"
-        poe_details = {}
-        if capabilities.get('poe_supported', False):
+        def port_count_section():
+            # Interface count (to determine port count)
+            port_count = "unknown"
             try:
-                # Use chassis-level PoE data since REST PoE endpoints return 404
-                chassis_url = f"https://{switch_ip}/rest/v10.09/system/subsystems/chassis,1"
-                chassis_response = session_obj.get(chassis_url, timeout=5, verify=Config.SSL_VERIFY)
-                api_logger.log_api_call('GET', chassis_url, {}, None, chassis_response.status_code, chassis_response.text, 0)
+                # A fresh bulk interface fetch already lists every physical port
+                cached_interfaces = get_cached(interface_cache, switch_ip, 'interfaces_bulk')
+                if cached_interfaces and cached_interfaces.get('interfaces'):
+                    return str(sum(1 for iface in cached_interfaces['interfaces'] if _PHY_RE.match(iface['name'])))
                 
-                if chassis_response.status_code == 200:
-                    chassis_data = chassis_response.json()
-                    poe_power = chassis_data.get('poe_power', {})
-                    if poe_power:
-                        # Extract PoE power information
-                        available_power = poe_power.get('available_power', 0)
-                        drawn_power = poe_power.get('drawn_power', 0)
-                        reserved_power = poe_power.get('reserved_power', 0)
+                # Count physical interfaces (excluding sub-interfaces)
+                physical_ports = _fetch_physical_interface_names(switch_ip, session_obj)
+                if physical_ports is not None:
+                    port_count = str(len(physical_ports))
+            except Exception as e:
+                logger.debug("Error getting interface count: %s", e)
+            return port_count
+        
+        def poe_section(chassis_data: Optional[Dict[str, Any]]):
+            # PoE status from chassis subsystem data
+            poe_status = "N/A"
+            poe_details = {}
+            if capabilities.get('poe_supported', False):
+                try:
+                    # Use chassis-level PoE data since REST PoE endpoints return 404
+                    if chassis_data is not None:
+                        poe_power = chassis_data.get('poe_power', {})
+                        if poe_power:
+                            # Extract PoE power information
+                            available_power = poe_power.get('available_power', 0)
+                            drawn_power = poe_power.get('drawn_power', 0)
+                            reserved_power = poe_power.get('reserved_power', 0)
                         
-                        if available_power > 0:
-                            # Calculate PoE utilization
-                            utilization = (drawn_power / available_power) * 100 if available_power > 0 else 0
+                            if available_power > 0:
+                                # Calculate PoE utilization
+                                utilization = (drawn_power / available_power) * 100 if available_power > 0 else 0
                             
-                            # Set status based on utilization
-                            if utilization > 95:
-                                poe_status = "warning"  # Near capacity
-                            elif utilization > 0:
-                                poe_status = "ok"
-                            else:
-                                poe_status = "ok"  # Available but not in use
+                                poe_status = classify_percentage(utilization, _POE_SEVERITY_BANDS)
                             
-                            # Store PoE details for UI
-                            poe_details = {
-                                'available_power': available_power,
-                                'drawn_power': drawn_power,
-                                'reserved_power': reserved_power,
-                                'utilization_percent': round(utilization, 1),
-                                'status': poe_status
-                            }
+                                # Store PoE details for UI
+                                poe_details = {
+                                    'available_power': available_power,
+                                    'drawn_power': drawn_power,
+                                    'reserved_power': reserved_power,
+                                    'utilization_percent': round(utilization, 1),
+                                    'status': poe_status
+                                }
+                            else:
+                                poe_status = "error"  # PoE subsystem present but no available power
                         else:
-                            poe_status = "error"  # PoE subsystem present but no available power
+                            poe_status = "unknown"  # No PoE data in chassis - might not have PoE
                     else:
-                        poe_status = "unknown"  # No PoE data in chassis - might not have PoE
-                else:
+                        poe_status = "unknown"
+                except Exception as e:
+                    logger.debug("Error getting PoE status from chassis: %s", e)
                     poe_status = "unknown"
-            except Exception as e:
-                logger.debug(f"Error getting PoE status from chassis: {e}")
-                poe_status = "unknown"
+            return poe_status, poe_details
+        
+        def chassis_sections():
+            chassis_data = fetch_chassis()
+            return power_section(chassis_data), fan_section(chassis_data), poe_section(chassis_data)
+        
+        # The sections are independent, so run them side by side. Port count and CPU
+        # are single GETs and go to the shared I/O pool; the chassis sections may fan
+        # out onto that pool themselves, so they run on this thread.
+        pool = _get_io_pool()
+        port_future = pool.submit(port_count_section)
+        cpu_future = pool.submit(get_cpu_usage, switch_ip, session_obj, capabilities)
+        (power_status, power_supplies_info), (fan_status, fans_info), (poe_status, poe_details) = chassis_sections()
+        port_count = port_future.result()
+        cpu_usage, cpu_status = cpu_future.result()
         
         # Get model information
         platform_name = system_data.get('platform_name', 'Unknown')
@@ -1473,13 +1822,9 @@ def get_switch_overview(switch_ip: str):
         health_status = "ONLINE"
         health_reasons = []
         
-        # Check for specific PSU errors
-        psu_errors = [psu for psu in power_supplies_info if psu['status'] == 'error']
-        psu_warnings = [psu for psu in power_supplies_info if psu['status'] == 'warning']
-        
-        # Check for specific fan errors
-        fan_errors = [fan for fan in fans_info if fan['status'] == 'error']
-        fan_warnings = [fan for fan in fans_info if fan['status'] == 'warning']
+        # Check for specific PSU and fan errors
+        psu_errors, psu_warnings = split_by_status(power_supplies_info)
+        fan_errors, fan_warnings = split_by_status(fans_info)
         
         # Check for errors
         if psu_errors:
@@ -1553,59 +1898,44 @@ def get_switch_overview(switch_ip: str):
         
         return overview_data
     try:
-        # Attempt to use cache for overview (60s TTL)
-        overview = get_cached_or_fetch(switch_cache, switch_ip, 'overview', fetch_overview, ttl=60)
-        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/overview', {}, None, 200, str(overview), 0)
-        return jsonify(overview)
+        # Attempt to use cache for overview (60s TTL); a recently expired overview is served
+        # while a single background refresh runs, so clients never wait on an expiry
+        overview = get_cached_or_fetch(switch_cache, switch_ip, 'overview', fetch_overview, ttl=OVERVIEW_CACHE_TTL,
+                                       stale_while_revalidate=True)
+        # Encode once; the logger only decodes the prefix it keeps
+        body = json_codec.dumps(overview)
+        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/overview', {}, None, 200, body, 0, switch_ip)
+        return app.response_class(body, mimetype='application/json')
     except Exception as e:
         logger.error(f"Error getting overview for {switch_ip}: {e}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         error_response = {'error': f'Failed to get switch overview: {str(e)}'}
-        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/overview', {}, None, 500, str(error_response), 0)
+        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/overview', {}, None, 500, str(error_response), 0, switch_ip)
         return jsonify(error_response), 500
 
 @app.route('/api/switches/<switch_ip>/vlans')
-def get_switch_vlans(switch_ip: str):
+@with_session
+def get_switch_vlans(switch_ip: str, session_obj):
     """Get real VLAN data from the switch."""
+    base = direct_rest_manager.base_url(switch_ip)
     try:
-        # Two-attempt authentication with session cleanup on failure
-        session_obj = None
-        
-        for attempt in range(2):
-            try:
-                session_obj = direct_rest_manager._authenticate(switch_ip)
-                logger.info(f"Authentication successful for VLANs on {switch_ip} on attempt {attempt + 1}")
-                break
-            except Exception as auth_error:
-                logger.warning(f"VLANs auth attempt {attempt + 1} failed for {switch_ip}: {auth_error}")
-                if attempt == 0:
-                    logger.info(f"Cleaning up sessions for VLANs call on {switch_ip}")
-                    direct_rest_manager.cleanup_session(switch_ip)
-                    time.sleep(1)
-                else:
-                    logger.error(f"VLANs authentication failed after 2 attempts for {switch_ip}")
-                    error_response = {'error': f'Authentication failed: {str(auth_error)}'}
-                    api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/vlans', {}, None, 401, str(error_response), 0)
-                    return jsonify(error_response), 401
-        
-        if not session_obj:
-            error_response = {'error': 'Failed to authenticate to switch'}
-            api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/vlans', {}, None, 401, str(error_response), 0)
-            return jsonify(error_response), 401
-        
-        # Get VLANs list
-        vlans_url = f"https://{switch_ip}/rest/v10.09/system/vlans"
-        vlans_response = session_obj.get(vlans_url, timeout=10, verify=Config.SSL_VERIFY)
-        api_logger.log_api_call('GET', vlans_url, {}, None, vlans_response.status_code, vlans_response.text, 0)
-        
-        if vlans_response.status_code != 200:
-            error_response = {'error': f'Failed to get VLANs: {vlans_response.status_code}'}
-            api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/vlans', {}, None, 500, str(error_response), 0)
-            return jsonify(error_response), 500
+        # Get all VLANs with their details in one request
+        bulk_url = f"{base}/system/vlans?depth=1&attributes={_VLAN_ATTRIBUTES}"
+        status_code, vlans_list = _get_json_conditional(switch_ip, session_obj, bulk_url, timeout=10)
+        
+        if status_code != 200:
+            # Fall back to the plain listing plus per-VLAN detail requests
+            vlans_url = f"{base}/system/vlans"
+            vlans_response = session_obj.get(vlans_url, timeout=10, verify=Config.SSL_VERIFY)
+            api_logger.log_api_call('GET', vlans_url, {}, None, vlans_response.status_code, vlans_response.content, 0, switch_ip)
             
-        vlans_list = vlans_response.json()
-        vlans_data = []
+            if vlans_response.status_code != 200:
+                error_response = {'error': f'Failed to get VLANs: {vlans_response.status_code}'}
+                api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/vlans', {}, None, 500, str(error_response), 0, switch_ip)
+                return jsonify(error_response), 500
+                
+            vlans_list = json_codec.loads(vlans_response.content)
         
         # Get cached interfaces to calculate VLAN membership
         try:
@@ -1615,195 +1945,153 @@ def get_switch_vlans(switch_ip: str):
             logger.warning(f"Failed to get interface data for VLAN membership: {e}")
             vlan_membership = {}
         
-        # Get details for each VLAN
-        for vlan_id, vlan_url in vlans_list.items():
+        def vlan_entry(vlan_id: str, vlan_data: Dict[str, Any]) -> Dict[str, Any]:
+            vlan_int_id = int(vlan_id)
+            membership = vlan_membership.get(vlan_int_id, {'tagged': 0, 'untagged': 0})
+            return {
+                'id': vlan_int_id,
+                'name': vlan_data.get('name', f'VLAN{vlan_id}'),
+                'admin_state': vlan_data.get('admin', 'unknown'),
+                'oper_state': vlan_data.get('oper_state', 'unknown'),
+                'description': vlan_data.get('description', ''),
+                'tagged_interfaces': membership['tagged'],
+                'untagged_interfaces': membership['untagged']
+            }
+        
+        def fetch_vlan_detail(vlan_id: str) -> Dict[str, Any]:
+            vlan_data = {}
             try:
-                vlan_detail_url = f"https://{switch_ip}/rest/v10.09/system/vlans/{vlan_id}"
+                vlan_detail_url = f"{base}/system/vlans/{vlan_id}?attributes={_VLAN_ATTRIBUTES}"
                 vlan_response = session_obj.get(vlan_detail_url, timeout=5, verify=Config.SSL_VERIFY)
-                api_logger.log_api_call('GET', vlan_detail_url, {}, None, vlan_response.status_code, vlan_response.text, 0)
+                api_logger.log_api_call('GET', vlan_detail_url, {}, None, vlan_response.status_code, vlan_response.content, 0, switch_ip)
                 
                 if vlan_response.status_code == 200:
-                    vlan_data = vlan_response.json()
-                    vlan_int_id = int(vlan_id)
-                    membership = vlan_membership.get(vlan_int_id, {'tagged': 0, 'untagged': 0})
-                    
-                    vlans_data.append({
-                        'id': vlan_int_id,
-                        'name': vlan_data.get('name', f'VLAN{vlan_id}'),
-                        'admin_state': vlan_data.get('admin', 'unknown'),
-                        'oper_state': vlan_data.get('oper_state', 'unknown'),
-                        'description': vlan_data.get('description', ''),
-                        'tagged_interfaces': membership['tagged'],
-                        'untagged_interfaces': membership['untagged']
-                    })
+                    vlan_data = json_codec.loads(vlan_response.content)
                 else:
                     logger.warning(f"Failed to get VLAN {vlan_id} details: {vlan_response.status_code}")
-                    vlan_int_id = int(vlan_id)
-                    membership = vlan_membership.get(vlan_int_id, {'tagged': 0, 'untagged': 0})
-                    
-                    vlans_data.append({
-                        'id': vlan_int_id,
-                        'name': f'VLAN{vlan_id}',
-                        'admin_state': 'unknown',
-                        'oper_state': 'unknown',
-                        'description': '',
-                        'tagged_interfaces': membership['tagged'],
-                        'untagged_interfaces': membership['untagged']
-                    })
             except Exception as e:
+                # Basic VLAN info is still returned if details fail
                 logger.warning(f"Error getting VLAN {vlan_id} details: {e}")
-                # Add basic VLAN info even if details fail
-                vlan_int_id = int(vlan_id)
-                membership = vlan_membership.get(vlan_int_id, {'tagged': 0, 'untagged': 0})
-                
-                vlans_data.append({
-                    'id': vlan_int_id,
-                    'name': f'VLAN{vlan_id}',
-                    'admin_state': 'unknown',
-                    'oper_state': 'unknown',
-                    'description': '',
-                    'tagged_interfaces': membership['tagged'],
-                    'untagged_interfaces': membership['untagged']
-                })
+            return vlan_entry(vlan_id, vlan_data)
         
-        # Sort by VLAN ID
-        vlans_data.sort(key=lambda x: x['id'])
+        vlan_ids = sorted(vlans_list, key=int)
+        if all(isinstance(vlan_data, dict) for vlan_data in vlans_list.values()):
+            # Bulk response already carries the details
+            vlans_data = [vlan_entry(vlan_id, vlans_list[vlan_id]) for vlan_id in vlan_ids]
+        else:
+            # Plain listing of URIs: get details for all VLANs concurrently, in numeric ID order
+            vlans_data = _fan_out(fetch_vlan_detail, vlan_ids)
         
         result = {'vlans': vlans_data, 'total_count': len(vlans_data)}
-        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/vlans', {}, None, 200, str(result), 0)
-        return jsonify(result)
+        body = json_codec.dumps(result)
+        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/vlans', {}, None, 200, body, 0, switch_ip)
+        return app.response_class(body, mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Error getting VLANs for {switch_ip}: {e}")
         error_response = {'error': f'Failed to get VLANs: {str(e)}'}
-        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/vlans', {}, None, 500, str(error_response), 0)
+        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/vlans', {}, None, 500, str(error_response), 0, switch_ip)
         return jsonify(error_response), 500
 
 @app.route('/api/switches/<switch_ip>/interfaces')
-def get_switch_interfaces(switch_ip: str):
+@with_session
+def get_switch_interfaces(switch_ip: str, session_obj):
     """Get interface data using cached bulk fetch with optional LLDP."""
+    base = direct_rest_manager.base_url(switch_ip)
     try:
         # Get include parameters for additional data
         include_lldp = request.args.get('include') == 'lldp'
         
         def fetch_interfaces():
-            # Two-attempt authentication with session cleanup on failure
-            session_obj = None
-            for attempt in range(2):
-                try:
-                    session_obj = direct_rest_manager._authenticate(switch_ip)
-                    logger.info(f"Authentication successful for interfaces on {switch_ip} on attempt {attempt + 1}")
-                    break
-                except Exception as auth_error:
-                    logger.warning(f"Interfaces auth attempt {attempt + 1} failed for {switch_ip}: {auth_error}")
-                    if attempt == 0:
-                        logger.info(f"Cleaning up sessions for interfaces call on {switch_ip}")
-                        direct_rest_manager.cleanup_session(switch_ip)
-                        time.sleep(1)
-                    else:
-                        raise auth_error
-            
-            if not session_obj:
-                raise Exception('Failed to authenticate to switch')
-            
             # Fetch bulk interfaces with VLAN data
             interfaces_data = _fetch_bulk_interfaces(switch_ip, session_obj)
             
-            # Add LLDP neighbors if requested (per-port calls but cached)
+            # Add LLDP neighbors if requested (per-port calls but cached, fetched concurrently)
             if include_lldp and interfaces_data.get('interfaces'):
-                enhanced_interfaces = []
-                for interface in interfaces_data['interfaces']:
-                    enhanced_interface = interface.copy()
-                    
-                    # Fetch LLDP neighbors for this interface
+                def fetch_lldp(interface: Dict[str, Any]) -> List[Dict[str, Any]]:
                     try:
-                        lldp_neighbors = _fetch_interface_lldp_neighbors(switch_ip, session_obj, interface['name'])
-                        enhanced_interface['lldp_neighbors'] = lldp_neighbors
-                        enhanced_interface['lldp_count'] = len(lldp_neighbors)
+                        return _fetch_interface_lldp_neighbors(switch_ip, session_obj, interface['name'])
                     except Exception as e:
                         logger.debug(f"LLDP fetch failed for {interface['name']}: {e}")
-                        enhanced_interface['lldp_neighbors'] = []
-                        enhanced_interface['lldp_count'] = 0
-                    
+                        return []
+                
+                lldp_results = _fan_out(fetch_lldp, interfaces_data['interfaces'])
+                enhanced_interfaces = []
+                for interface, lldp_neighbors in zip(interfaces_data['interfaces'], lldp_results):
+                    enhanced_interface = interface.copy()
+                    enhanced_interface['lldp_neighbors'] = lldp_neighbors
+                    enhanced_interface['lldp_count'] = len(lldp_neighbors)
                     enhanced_interfaces.append(enhanced_interface)
                 
                 interfaces_data['interfaces'] = enhanced_interfaces
             
             return interfaces_data
         
-        # Use cache with 5-minute TTL
+        # Use cache with 5-minute TTL; recently expired data is served while it refreshes
         cache_key = f"interfaces_bulk{'_lldp' if include_lldp else ''}"
         try:
-            interfaces_data = get_cached_or_fetch(interface_cache, switch_ip, cache_key, fetch_interfaces)
+            interfaces_data = get_cached_or_fetch(interface_cache, switch_ip, cache_key, fetch_interfaces,
+                                                  stale_while_revalidate=True)
         except Exception as cache_error:
             logger.warning(f"Cache error, falling back to direct fetch: {cache_error}")
             interfaces_data = fetch_interfaces()
 
+        def fetch_mgmt_interface() -> List[Dict[str, Any]]:
+            # Reuse the authenticated session to get system mgmt status
+            sys_data = _get_json(switch_ip, session_obj, f"{base}/system")
+            if sys_data is None:
+                raise Exception('Failed to get system information')
+            mgmt = sys_data.get('mgmt_intf_status') or {}
+            ipv4 = mgmt.get('ip') or mgmt.get('ip_address') or mgmt.get('ipv4')
+            status = (mgmt.get('status') or mgmt.get('link_state') or 'unknown').lower()
+            # Normalize status to up/down/disabled
+            if status == 'down':
+                norm = 'disabled'
+            elif status == 'up' or ipv4:
+                norm = 'up'
+            else:
+                norm = 'down'
+            return [{
+                'name': 'mgmt',
+                'admin_state': 'up' if norm == 'up' else 'down',
+                'link_state': 'up' if norm == 'up' else 'down',
+                'status': norm,
+                'description': 'Management interface',
+                'ipv4': ipv4 or '',
+                'ipv6': mgmt.get('ipv6') or ''
+            }]
+        
         # Ensure management interface is present using system mgmt_intf_status if not found in bulk
-        try:
-            if not interfaces_data.get('management'):
-                # Reuse existing authenticated session to get system mgmt status
-                session_obj = direct_rest_manager._authenticate(switch_ip)
-                sys_url = f"https://{switch_ip}/rest/v10.09/system"
-                sys_resp = session_obj.get(sys_url, timeout=5, verify=Config.SSL_VERIFY)
-                api_logger.log_api_call('GET', sys_url, {}, None, sys_resp.status_code, sys_resp.text, 0)
-                if sys_resp.status_code == 200:
-                    sys_data = sys_resp.json()
-                    mgmt = sys_data.get('mgmt_intf_status') or {}
-                    ipv4 = mgmt.get('ip') or mgmt.get('ip_address') or mgmt.get('ipv4')
-                    status = (mgmt.get('status') or mgmt.get('link_state') or 'unknown').lower()
-                    # Normalize status to up/down/disabled
-                    if status == 'down':
-                        norm = 'disabled'
-                    elif status == 'up' or ipv4:
-                        norm = 'up'
-                    else:
-                        norm = 'down'
-                    interfaces_data['management'] = [{
-                        'name': 'mgmt',
-                        'admin_state': 'up' if norm == 'up' else 'down',
-                        'link_state': 'up' if norm == 'up' else 'down',
-                        'status': norm,
-                        'description': 'Management interface',
-                        'ipv4': ipv4 or '',
-                        'ipv6': mgmt.get('ipv6') or ''
-                    }]
-        except Exception as e:
-            logger.debug(f"Failed to populate management interface from system: {e}")
+        management = interfaces_data.get('management', [])
+        if not management:
+            try:
+                management = get_cached_or_fetch(switch_cache, switch_ip, 'mgmt_intf', fetch_mgmt_interface, ttl=60)
+            except Exception as e:
+                logger.debug(f"Failed to populate management interface from system: {e}")
         
         result = {
             'interfaces': interfaces_data.get('interfaces', []),
-            'management': interfaces_data.get('management', []),
+            'management': management,
             'total_count': interfaces_data.get('total_count', 0)
         }
-        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/interfaces', {}, None, 200, str(result), 0)
-        return jsonify(result)
+        body = json_codec.dumps(result)
+        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/interfaces', {}, None, 200, body, 0, switch_ip)
+        return app.response_class(body, mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Error getting interfaces for {switch_ip}: {e}")
         error_response = {'error': f'Failed to get interfaces: {str(e)}'}
-        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/interfaces', {}, None, 500, str(error_response), 0)
+        api_logger.log_api_call('GET', f'/api/switches/{switch_ip}/interfaces', {}, None, 500, str(error_response), 0, switch_ip)
         return jsonify(error_response), 500
 
 @app.route('/api/switches/<switch_ip>/vlans/<int:vlan_id>', methods=['PATCH'])
-def edit_vlan(switch_ip: str, vlan_id: int):
+@with_session
+def edit_vlan(switch_ip: str, session, vlan_id: int):
     """Edit a VLAN on the switch."""
+    base = direct_rest_manager.base_url(switch_ip)
     try:
         data = request.get_json() or {}
         
-        # Two-attempt authentication with session cleanup on failure
-        session = None
-        for attempt in range(2):
-            try:
-                session = direct_rest_manager._authenticate(switch_ip)
-                break
-            except Exception as auth_error:
-                if attempt == 0:
-                    direct_rest_manager.cleanup_session(switch_ip)
-                    time.sleep(1)
-                else:
-                    return jsonify({'error': f'Authentication failed: {str(auth_error)}'}), 401
-        
         # Build update payload
         update_data = {}
         if 'name' in data:
@@ -1818,46 +2106,36 @@ def edit_vlan(switch_ip: str, vlan_id: int):
             
         # PATCH the VLAN
         patch_response = session.patch(
-            f"https://{switch_ip}/rest/v10.09/system/vlans/{vlan_id}",
+            f"{base}/system/vlans/{vlan_id}",
             json=update_data,
             timeout=10,
             verify=Config.SSL_VERIFY
         )
         
         if patch_response.status_code in [200, 204]:
+            invalidate_switch_tags(switch_ip, 'vlan_write')
             result = {'status': 'success', 'message': f'VLAN {vlan_id} updated successfully'}
-            api_logger.log_api_call('PATCH', f'/api/switches/{switch_ip}/vlans/{vlan_id}', {}, None, 200, str(result), 0)
+            api_logger.log_api_call('PATCH', f'/api/switches/{switch_ip}/vlans/{vlan_id}', {}, None, 200, str(result), 0, switch_ip)
             return jsonify(result)
         else:
             error_response = {'error': f'Failed to update VLAN: {patch_response.text}'}
-            api_logger.log_api_call('PATCH', f'/api/switches/{switch_ip}/vlans/{vlan_id}', {}, None, patch_response.status_code, str(error_response), 0)
+            api_logger.log_api_call('PATCH', f'/api/switches/{switch_ip}/vlans/{vlan_id}', {}, None, patch_response.status_code, str(error_response), 0, switch_ip)
             return jsonify(error_response), patch_response.status_code
             
     except Exception as e:
         logger.error(f"Error editing VLAN {vlan_id} on {switch_ip}: {e}")
         error_response = {'error': f'Failed to edit VLAN: {str(e)}'}
-        api_logger.log_api_call('PATCH', f'/api/switches/{switch_ip}/vlans/{vlan_id}', {}, None, 500, str(error_response), 0)
+        api_logger.log_api_call('PATCH', f'/api/switches/{switch_ip}/vlans/{vlan_id}', {}, None, 500, str(error_response), 0, switch_ip)
         return jsonify(error_response), 500
 
 @app.route('/api/switches/<switch_ip>/interfaces/<path:interface_name>', methods=['PATCH'])
-def edit_interface(switch_ip: str, interface_name: str):
+@with_session
+def edit_interface(switch_ip: str, session, interface_name: str):
     """Edit an interface on the switch."""
+    base = direct_rest_manager.base_url(switch_ip)
     try:
         data = request.get_json() or {}
         
-        # Two-attempt authentication with session cleanup on failure
-        session = None
-        for attempt in range(2):
-            try:
-                session = direct_rest_manager._authenticate(switch_ip)
-                break
-            except Exception as auth_error:
-                if attempt == 0:
-                    direct_rest_manager.cleanup_session(switch_ip)
-                    time.sleep(1)
-                else:
-                    return jsonify({'error': f'Authentication failed: {str(auth_error)}'}), 401
-        
         # Build update payload
         update_data = {}
         if 'description' in data:
@@ -1874,11 +2152,11 @@ def edit_interface(switch_ip: str, interface_name: str):
             return jsonify({'error': 'No valid fields to update'}), 400
         
         # URL encode interface name
-        encoded_name = interface_name.replace('/', '%2F')
+        encoded_name = _url_key(interface_name)
         
         # PATCH the interface
         patch_response = session.patch(
-            f"https://{switch_ip}/rest/v10.09/system/interfaces/{encoded_name}",
+            f"{base}/system/interfaces/{encoded_name}",
             json=update_data,
             timeout=10,
             verify=Config.SSL_VERIFY
@@ -1886,18 +2164,19 @@ def edit_interface(switch_ip: str, interface_name: str):
         
         url_path = f'/api/switches/{switch_ip}/interfaces/{interface_name}'
         if patch_response.status_code in [200, 204]:
+            invalidate_switch_tags(switch_ip, 'interface_write')
             result = {'status': 'success', 'message': f'Interface {interface_name} updated successfully'}
-            api_logger.log_api_call('PATCH', url_path, {}, update_data, 200, str(result), 0)
+            api_logger.log_api_call('PATCH', url_path, {}, update_data, 200, str(result), 0, switch_ip)
             return jsonify(result)
         else:
             error_response = {'error': f'Failed to update interface: {patch_response.text}'}
-            api_logger.log_api_call('PATCH', url_path, {}, update_data, patch_response.status_code, str(error_response), 0)
+            api_logger.log_api_call('PATCH', url_path, {}, update_data, patch_response.status_code, str(error_response), 0, switch_ip)
             return jsonify(error_response), patch_response.status_code
             
     except Exception as e:
         logger.error(f"Error editing interface {interface_name} on {switch_ip}: {e}")
         error_response = {'error': f'Failed to edit interface: {str(e)}'}
-        api_logger.log_api_call('PATCH', f'/api/switches/{switch_ip}/interfaces/{interface_name}', {}, None, 500, str(error_response), 0)
+        api_logger.log_api_call('PATCH', f'/api/switches/{switch_ip}/interfaces/{interface_name}', {}, None, 500, str(error_response), 0, switch_ip)
         return jsonify(error_response), 500
 
 @app.route('/api/diagnostics/<switch_ip>')
@@ -1916,12 +2195,13 @@ def run_switch_diagnostics(switch_ip: str):
 @app.route('/debug/test-auth/<switch_ip>', methods=['GET'])
 def test_authentication_debug(switch_ip: str):
     """Debug authentication to see what's happening."""
+    base = direct_rest_manager.base_url(switch_ip)
     try:
         session = direct_rest_manager._authenticate(switch_ip)
         
         # Try to get system info
         response = session.get(
-            f"https://{switch_ip}/rest/v10.09/system",
+            f"{base}/system",
             timeout=10,
             verify=Config.SSL_VERIFY
         )
@@ -3,10 +3,14 @@ Application configuration and settings management.
 """
 import os
 from typing import List
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from the project's .env file, if there is one.
+# Deployments that pass the environment directly (e.g. docker --env-file)
+# skip importing python-dotenv and searching the filesystem for it.
+_ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+if os.path.isfile(_ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_FILE)
 
 class Config:
     """Application configuration from environment variables."""
@@ -17,8 +21,16 @@ class Config:
     
     # API settings
     API_VERSION = os.getenv('API_VERSION', '10.15')
+    # REST path version used for direct switch calls (confirmed working)
+    REST_API_VERSION = os.getenv('REST_API_VERSION', 'v10.09')
     SSL_VERIFY = os.getenv('SSL_VERIFY', 'False').lower() == 'true'
     
+    # Keep-alive connections held open per switch session
+    SWITCH_MAX_CONNECTIONS = int(os.getenv('SWITCH_MAX_CONNECTIONS', '8'))
+    SWITCH_IO_WORKERS = int(os.getenv('SWITCH_IO_WORKERS', '32'))
+    # Per-item GETs kept in flight at once when fanning out against one switch
+    SWITCH_FETCH_CONCURRENCY = int(os.getenv('SWITCH_FETCH_CONCURRENCY', '4'))
+    
     # Flask settings
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-me')
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
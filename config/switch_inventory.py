@@ -4,11 +4,19 @@ Switch inventory management for multi-switch operations.
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 from datetime import datetime
+import ipaddress
 import logging
+import threading
+
+from core.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Saved credentials are dropped an hour after they were last stored
+CREDENTIAL_TTL = 3600
+MAX_SAVED_CREDENTIALS = 256
+
+@dataclass(slots=True)
 class SwitchInfo:
     """Information about a managed switch."""
     ip_address: str
@@ -48,32 +56,50 @@ class SwitchInventory:
     
     def __init__(self):
         self._switches: Dict[str, SwitchInfo] = {}
-        self._credentials: Dict[str, Dict[str, str]] = {}  # Store credentials per switch
+        # Credentials per switch; bounded and expiring so passwords for
+        # switches that are no longer used do not stay in memory
+        self._credentials = TTLCache(default_ttl=CREDENTIAL_TTL, maxsize=MAX_SAVED_CREDENTIALS)
+        # Switches keyed by status, kept in step with _switches so status
+        # counts and the online list do not need a scan of the inventory
+        self._by_status: Dict[str, Dict[str, SwitchInfo]] = {}
+        # Request threads share this inventory; guards mutation and iteration
+        self._lock = threading.Lock()
         
     def add_switch(self, ip_address: str, name: Optional[str] = None, 
-                   connection_type: str = "direct", **kwargs) -> bool:
-        """Add a switch to the inventory."""
+                   connection_type: str = "direct", **kwargs) -> Optional[SwitchInfo]:
+        """Add a switch to the inventory; returns the new entry, or None if the IP is invalid."""
         if connection_type == "direct":
             if not self.is_valid_ip(ip_address):
-                return False
+                return None
         
-        self._switches[ip_address] = SwitchInfo(
+        switch = SwitchInfo(
             ip_address=ip_address,
             name=name,
             connection_type=connection_type,
             **kwargs
         )
+        with self._lock:
+            self._store(switch)
         logger.info(f"Added {connection_type} switch {ip_address} to inventory")
-        return True
+        return switch
     
     def add_central_switch(self, device_serial: str, name: Optional[str] = None,
                           client_id: str = None, client_secret: str = None,
-                          customer_id: str = None, base_url: str = None) -> bool:
-        """Add a Central-managed switch to the inventory."""
+                          customer_id: str = None, base_url: str = None) -> SwitchInfo:
+        """Add a Central-managed switch to the inventory and return the new entry."""
+        switch = self.make_central_switch(device_serial, name, client_id, client_secret,
+                                          customer_id, base_url)
+        return self.add_switch_info(switch)
+    
+    @staticmethod
+    def make_central_switch(device_serial: str, name: Optional[str] = None,
+                            client_id: str = None, client_secret: str = None,
+                            customer_id: str = None, base_url: str = None) -> SwitchInfo:
+        """Build the entry for a Central-managed switch without storing it."""
         # Use device serial as the key for Central devices
         switch_key = f"central:{device_serial}"
         
-        self._switches[switch_key] = SwitchInfo(
+        return SwitchInfo(
             ip_address=switch_key,  # Use as identifier
             name=name or device_serial,
             connection_type="central",
@@ -83,13 +109,24 @@ class SwitchInventory:
             customer_id=customer_id,
             base_url=base_url or "https://apigw-prod2.central.arubanetworks.com"
         )
-        logger.info(f"Added Central-managed switch {device_serial} to inventory")
-        return True
+    
+    def add_switch_info(self, switch: SwitchInfo) -> SwitchInfo:
+        """Store a prepared switch entry (e.g. from make_central_switch)."""
+        with self._lock:
+            self._store(switch)
+        if switch.connection_type == "central":
+            logger.info(f"Added Central-managed switch {switch.device_serial} to inventory")
+        else:
+            logger.info(f"Added {switch.connection_type} switch {switch.ip_address} to inventory")
+        return switch
     
     def remove_switch(self, ip_address: str) -> bool:
         """Remove a switch from the inventory."""
-        if ip_address in self._switches:
-            del self._switches[ip_address]
+        with self._lock:
+            removed = self._switches.pop(ip_address, None)
+            if removed is not None:
+                self._unindex(removed)
+        if removed is not None:
             logger.info(f"Removed switch {ip_address} from inventory")
             return True
         return False
@@ -100,16 +137,22 @@ class SwitchInventory:
     
     def get_all_switches(self) -> List[SwitchInfo]:
         """Get all switches in inventory."""
-        return list(self._switches.values())
+        with self._lock:
+            return list(self._switches.values())
     
     def update_switch_status(self, ip_address: str, status: str, 
                            error_message: Optional[str] = None,
                            firmware_version: Optional[str] = None,
                            model: Optional[str] = None):
         """Update switch status and metadata."""
-        if ip_address in self._switches:
-            switch = self._switches[ip_address]
-            switch.status = status
+        with self._lock:
+            switch = self._switches.get(ip_address)
+            if switch is None:
+                return
+            if switch.status != status:
+                self._unindex(switch)
+                switch.status = status
+                self._by_status.setdefault(status, {})[ip_address] = switch
             switch.last_seen = datetime.now() if status == "online" else switch.last_seen
             switch.error_message = error_message
             if firmware_version:
@@ -119,23 +162,35 @@ class SwitchInventory:
     
     def get_online_switches(self) -> List[SwitchInfo]:
         """Get only switches that are currently online."""
-        return [switch for switch in self._switches.values() 
-                if switch.status == "online"]
+        with self._lock:
+            return list(self._by_status.get("online", {}).values())
     
     def get_switch_count(self) -> Dict[str, int]:
         """Get count of switches by status."""
-        counts = {"total": len(self._switches), "online": 0, "offline": 0, "error": 0}
-        for switch in self._switches.values():
-            if switch.status in counts:
-                counts[switch.status] += 1
+        with self._lock:
+            counts = {"total": len(self._switches)}
+            for status in ("online", "offline", "error"):
+                counts[status] = len(self._by_status.get(status, ()))
         return counts
     
+    def _store(self, switch: SwitchInfo) -> None:
+        """Add or replace an entry and its status index; caller holds _lock."""
+        previous = self._switches.get(switch.ip_address)
+        if previous is not None:
+            self._unindex(previous)
+        self._switches[switch.ip_address] = switch
+        self._by_status.setdefault(switch.status, {})[switch.ip_address] = switch
+    
+    def _unindex(self, switch: SwitchInfo) -> None:
+        """Drop an entry from the status index; caller holds _lock."""
+        self._by_status.get(switch.status, {}).pop(switch.ip_address, None)
+    
     def store_credentials(self, switch_ip: str, username: str, password: str) -> None:
         """Store credentials for a switch."""
-        self._credentials[switch_ip] = {
+        self._credentials.set(switch_ip, {
             'username': username,
             'password': password or ''
-        }
+        })
         logger.debug(f"Stored credentials for switch {switch_ip}")
     
     def get_saved_credentials(self, switch_ip: str) -> Optional[Dict[str, str]]:
@@ -144,17 +199,20 @@ class SwitchInventory:
     
     def remove_credentials(self, switch_ip: str) -> None:
         """Remove stored credentials for a switch."""
-        if switch_ip in self._credentials:
-            del self._credentials[switch_ip]
+        if self._credentials.get(switch_ip) is not None:
+            self._credentials.invalidate(switch_ip)
             logger.debug(f"Removed credentials for switch {switch_ip}")
     
     @staticmethod
     def is_valid_ip(ip_address: str) -> bool:
         """Basic IP address validation."""
+        # IPv4Address also accepts integers, which are not valid inventory keys
+        if not isinstance(ip_address, str):
+            return False
         try:
-            parts = ip_address.split('.')
-            return len(parts) == 4 and all(0 <= int(part) <= 255 for part in parts)
-        except (ValueError, AttributeError):
+            ipaddress.IPv4Address(ip_address)
+            return True
+        except ipaddress.AddressValueError:
             return False
 
 # Global inventory instance
@@ -5,19 +5,55 @@ Tracks all REST API calls with request/response details, timing, and success sta
 
 import time
 import logging
+import queue
+import re
+from collections import Counter, deque
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from threading import Lock
+from typing import Deque, Dict, List, Any, Optional, Sequence, Tuple, Union
+from threading import Event, Lock, Thread
+
+from core import json_codec
 
 logger = logging.getLogger(__name__)
 
+_PASSWORD_RE = re.compile(r'password=[^&]*', re.IGNORECASE)
+_SENSITIVE_KEY_RE = re.compile(r'password|secret|token', re.IGNORECASE)
+_SENSITIVE_HEADERS = frozenset({'authorization', 'cookie', 'set-cookie', 'x-auth-token'})
+# Checked in order against the lowercased URL; the first keyword found wins
+_CATEGORY_KEYWORDS = (
+    ('login', 'authentication'),
+    ('auth', 'authentication'),
+    ('vlan', 'vlan_management'),
+    ('system', 'system_info'),
+    ('logout', 'session_cleanup'),
+)
+_METHOD_CATEGORIES = {
+    'GET': 'data_retrieval',
+    'POST': 'configuration',
+    'PUT': 'configuration',
+    'PATCH': 'configuration',
+    'DELETE': 'deletion',
+}
+
 class APILogger:
     """Comprehensive API call logger with thread-safe operations."""
     
-    def __init__(self, max_history: int = 100):
-        self.call_history: List[Dict[str, Any]] = []
+    def __init__(self, max_history: int = 100, max_pending: int = 10000):
+        self.call_history: Deque[Dict[str, Any]] = deque(maxlen=max_history)
         self.max_history = max_history
+        self.dropped_calls = 0
         self._lock = Lock()
+        # Ids keep increasing once the history is full, so each entry's id is unique
+        self._last_id = 0
+        # Immutable copy of call_history built on the first read after a
+        # write (None while stale), so writes never pay for copying the history
+        self._snapshot: Optional[Tuple[Dict[str, Any], ...]] = ()
+        # Running totals over call_history, kept in step as entries are added and evicted
+        self._reset_stats()
+        # Calls are queued here and turned into entries on a background thread
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._worker = Thread(target=self._drain, name='api-logger', daemon=True)
+        self._worker.start()
         logger.info(f"APILogger initialized with max_history={max_history}")
     
     def log_api_call(self, 
@@ -26,62 +62,160 @@ class APILogger:
                      headers: Dict[str, str], 
                      request_data: Any, 
                      response_code: int, 
-                     response_text: str, 
+                     response_text: Union[str, bytes], 
                      duration_ms: float,
-                     switch_ip: Optional[str] = None) -> None:
-        """Log a complete API call with all details."""
+                     switch_ip: str) -> None:
+        """Log a complete API call with all details.
         
-        # Extract switch IP from URL if not provided
-        if not switch_ip and '://' in url:
-            try:
-                from urllib.parse import urlparse
-                parsed = urlparse(url)
-                switch_ip = parsed.hostname
-            except Exception:
-                switch_ip = 'unknown'
+        The call is only queued here; sanitizing, truncating and storing the
+        entry happen on the logger's background thread. response_text may be
+        the raw response body as bytes, in which case only the stored prefix
+        is decoded. headers without sensitive values are stored by reference,
+        so callers must not modify them afterwards. Calls are dropped if the
+        queue is full.
+        """
+        try:
+            self._pending.put_nowait((time.time(), method, url, headers, request_data,
+                                      response_code, response_text, duration_ms, switch_ip))
+        except queue.Full:
+            self.dropped_calls += 1
+    
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until calls queued before this point have been recorded."""
+        marker = Event()
+        try:
+            self._pending.put(marker, timeout=timeout)
+        except queue.Full:
+            return
+        marker.wait(timeout)
+    
+    def _drain(self, batch_size: int = 256) -> None:
+        """Record queued calls until the process exits.
+
+        Whatever is already queued (up to batch_size) is stored under a single
+        lock acquisition; flush markers are released once every call queued
+        before them is in the history.
+        """
+        while True:
+            batch = [self._pending.get()]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            
+            entries = []
+            for call in batch:
+                if isinstance(call, Event):
+                    self._store(entries)
+                    entries = []
+                    call.set()
+                    continue
+                try:
+                    entries.append(self._build_entry(*call))
+                except Exception as e:
+                    logger.debug(f"Failed to record API call: {e}")
+            self._store(entries)
+    
+    def _store(self, entries: List[Dict[str, Any]]) -> None:
+        """Append built entries to the history; the deque drops the oldest beyond max_history."""
+        if not entries:
+            return
+        with self._lock:
+            for entry in entries:
+                self._last_id += 1
+                entry['id'] = self._last_id
+                if len(self.call_history) == self.call_history.maxlen:
+                    self._count(self.call_history[0], -1)
+                self.call_history.append(entry)
+                self._count(entry, 1)
+            self._snapshot = None
+    
+    def _calls(self) -> Tuple[Dict[str, Any], ...]:
+        """Return the current history as a tuple, rebuilding it if a write made it stale."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = tuple(self.call_history)
+                snapshot = self._snapshot
+        return snapshot
+    
+    def _reset_stats(self) -> None:
+        """Zero the running statistics; caller holds _lock (or is __init__)."""
+        self._successful_calls = 0
+        self._duration_total = 0.0
+        self._category_counts: Counter = Counter()
+        self._switch_counts: Counter = Counter()
+    
+    def _count(self, entry: Dict[str, Any], delta: int) -> None:
+        """Add (delta=1) or remove (delta=-1) one entry from the running statistics."""
+        if entry['success']:
+            self._successful_calls += delta
+        self._duration_total += delta * entry['duration_ms']
+        for counts, key in ((self._category_counts, entry.get('category', 'unknown')),
+                            (self._switch_counts, entry.get('switch_ip') or 'unknown')):
+            counts[key] += delta
+            if counts[key] <= 0:
+                del counts[key]
+    
+    def _build_entry(self,
+                timestamp: float,
+                method: str,
+                url: str,
+                headers: Dict[str, str],
+                request_data: Any,
+                response_code: int,
+                response_text: Union[str, bytes],
+                duration_ms: float,
+                switch_ip: str) -> Dict[str, Any]:
+        """Build the history entry for one call."""
         
         # Sanitize sensitive data
         sanitized_headers = self._sanitize_headers(headers)
         sanitized_data = self._sanitize_request_data(request_data)
+        category = self._categorize_call(url, method)
+        success = 200 <= response_code < 400
+        # Successful reads are not needed for debugging and the caller already
+        # has the body, so only their size is kept. This goes by method: most
+        # switch URLs fall under /system and are categorized as system_info
+        if method.upper() == 'GET' and 200 <= response_code < 300:
+            stored_text = ""
+        else:
+            stored_text = self._truncate_response(response_text)
         
         call_entry = {
-            'id': len(self.call_history) + 1,
-            'timestamp': datetime.now().isoformat(),
+            'id': None,  # assigned when stored
+            'timestamp': datetime.fromtimestamp(timestamp).isoformat(),
             'switch_ip': switch_ip,
             'method': method.upper(),
             'url': url,
             'headers': sanitized_headers,
             'request_data': sanitized_data,
             'response_code': response_code,
-            'response_text': self._truncate_response(response_text),
+            'response_text': stored_text,
             'response_size': len(response_text) if response_text else 0,
             'duration_ms': round(duration_ms, 2),
-            'success': 200 <= response_code < 400,
-            'category': self._categorize_call(url, method)
+            'success': success,
+            'category': category
         }
         
-        with self._lock:
-            self.call_history.append(call_entry)
-            if len(self.call_history) > self.max_history:
-                self.call_history.pop(0)
-        
         # Log to console with appropriate level
         log_level = logging.INFO if call_entry['success'] else logging.WARNING
-        logger.log(log_level, 
-                  f"API {method} {url} -> {response_code} ({duration_ms:.0f}ms)")
+        logger.log(log_level, "API %s %s -> %s (%.0fms)", method, url, response_code, duration_ms)
+        return call_entry
     
     def _sanitize_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
-        """Remove sensitive information from headers."""
-        sanitized = {}
-        sensitive_headers = {'authorization', 'cookie', 'set-cookie', 'x-auth-token'}
-        
-        for key, value in (headers or {}).items():
-            if key.lower() in sensitive_headers:
-                sanitized[key] = '***REDACTED***'
-            else:
-                sanitized[key] = value
-        
-        return sanitized
+        """Remove sensitive information from headers.
+
+        Headers without sensitive keys are returned as-is rather than copied.
+        """
+        if not headers:
+            return {}
+        if _SENSITIVE_HEADERS.isdisjoint(key.lower() for key in headers):
+            return headers
+        return {key: '***REDACTED***' if key.lower() in _SENSITIVE_HEADERS else value
+                for key, value in headers.items()}
     
     def _sanitize_request_data(self, data: Any) -> str:
         """Sanitize request data, hiding passwords and secrets."""
@@ -92,28 +226,31 @@ class APILogger:
             if isinstance(data, dict):
                 sanitized = {}
                 for key, value in data.items():
-                    if any(sensitive in key.lower() for sensitive in ['password', 'secret', 'token']):
+                    if _SENSITIVE_KEY_RE.search(key):
                         sanitized[key] = '***REDACTED***'
                     else:
                         sanitized[key] = value
                 return str(sanitized)
             elif isinstance(data, str):
                 # Handle query string parameters with passwords
-                if 'password=' in data.lower():
-                    import re
-                    data = re.sub(r'password=[^&]*', 'password=***REDACTED***', data, flags=re.IGNORECASE)
-                return data
+                return _PASSWORD_RE.sub('password=***REDACTED***', data)
             else:
                 return str(data)
         except Exception as e:
             logger.debug(f"Error sanitizing request data: {e}")
             return str(data)
     
-    def _truncate_response(self, response_text: str, max_length: int = 1000) -> str:
+    def _truncate_response(self, response_text: Union[str, bytes], max_length: int = 1000) -> str:
         """Truncate long response text for storage efficiency."""
         if not response_text:
             return ""
         
+        if isinstance(response_text, bytes):
+            head = response_text[:max_length].decode('utf-8', 'replace')
+            if len(response_text) <= max_length:
+                return head
+            return head + f"...[truncated, full length: {len(response_text)} bytes]"
+        
         if len(response_text) <= max_length:
             return response_text
         
@@ -122,23 +259,10 @@ class APILogger:
     def _categorize_call(self, url: str, method: str) -> str:
         """Categorize API calls for better organization."""
         url_lower = url.lower()
-        
-        if 'login' in url_lower or 'auth' in url_lower:
-            return 'authentication'
-        elif 'vlan' in url_lower:
-            return 'vlan_management'
-        elif 'system' in url_lower:
-            return 'system_info'
-        elif 'logout' in url_lower:
-            return 'session_cleanup'
-        elif method.upper() in ['GET']:
-            return 'data_retrieval'
-        elif method.upper() in ['POST', 'PUT', 'PATCH']:
-            return 'configuration'
-        elif method.upper() in ['DELETE']:
-            return 'deletion'
-        else:
-            return 'general'
+        for keyword, category in _CATEGORY_KEYWORDS:
+            if keyword in url_lower:
+                return category
+        return _METHOD_CATEGORIES.get(method.upper(), 'general')
     
     def get_recent_calls(self, limit: int = 20, 
                         switch_ip: Optional[str] = None,
@@ -146,8 +270,8 @@ class APILogger:
                         success_only: Optional[bool] = None,
                         since: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get recent API calls with optional filtering and timestamp sorting."""
-        with self._lock:
-            calls = list(self.call_history)
+        self.flush()
+        calls = list(self._calls())
         
         # Apply filters
         if switch_ip:
@@ -174,11 +298,15 @@ class APILogger:
         return calls[:limit] if limit else calls
     
     def get_call_statistics(self) -> Dict[str, Any]:
-        """Get statistics about API calls."""
+        """Get statistics about API calls from the running totals."""
+        self.flush()
         with self._lock:
-            calls = list(self.call_history)
-        
-        if not calls:
+            return self._statistics_locked()
+    
+    def _statistics_locked(self) -> Dict[str, Any]:
+        """Build the statistics from the running totals; caller holds _lock."""
+        total_calls = len(self.call_history)
+        if not total_calls:
             return {
                 'total_calls': 0,
                 'success_rate': 0,
@@ -186,73 +314,79 @@ class APILogger:
                 'categories': {},
                 'switches': {}
             }
-        
-        total_calls = len(calls)
-        successful_calls = len([c for c in calls if c['success']])
-        success_rate = (successful_calls / total_calls) * 100
-        
-        # Calculate average duration
-        durations = [c['duration_ms'] for c in calls if c.get('duration_ms') is not None and isinstance(c.get('duration_ms'), (int, float))]
-        avg_duration = sum(durations) / len(durations) if durations else 0
-        
-        # Category breakdown
-        categories = {}
-        for call in calls:
-            cat = call.get('category', 'unknown')
-            categories[cat] = categories.get(cat, 0) + 1
-        
-        # Switch breakdown
-        switches = {}
-        for call in calls:
-            switch = call.get('switch_ip') or 'unknown'
-            switches[switch] = switches.get(switch, 0) + 1
-        
+        successful_calls = self._successful_calls
         return {
             'total_calls': total_calls,
             'successful_calls': successful_calls,
             'failed_calls': total_calls - successful_calls,
-            'success_rate': round(success_rate, 1),
-            'average_duration': round(avg_duration, 2),
-            'categories': categories,
-            'switches': switches,
-            'last_call': calls[-1]['timestamp'] if calls else None
+            'success_rate': round((successful_calls / total_calls) * 100, 1),
+            'average_duration': round(self._duration_total / total_calls, 2),
+            'categories': dict(self._category_counts),
+            'switches': dict(self._switch_counts),
+            'last_call': self.call_history[-1]['timestamp']
         }
     
     def clear_history(self) -> int:
         """Clear all call history and return number of cleared entries."""
+        self.flush()
         with self._lock:
             cleared_count = len(self.call_history)
             self.call_history.clear()
+            self._snapshot = ()
+            self._reset_stats()
         
         logger.info(f"Cleared {cleared_count} API call log entries")
         return cleared_count
     
     def export_logs(self, format: str = 'json') -> str:
         """Export logs in specified format for debugging."""
-        with self._lock:
-            calls = list(self.call_history)
+        self.flush()
         
         if format.lower() == 'json':
-            import json
-            return json.dumps({
+            # Take the calls and their statistics in one locked read so both
+            # describe the same history
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = tuple(self.call_history)
+                calls = self._snapshot
+                statistics = self._statistics_locked()
+            return json_codec.dumps({
                 'exported_at': datetime.now().isoformat(),
                 'total_calls': len(calls),
-                'statistics': self.get_call_statistics(),
+                'statistics': statistics,
                 'calls': calls
-            }, indent=2)
+            }, indent=True).decode('utf-8')
         elif format.lower() == 'csv':
-            import io
-            import csv
-            
-            output = io.StringIO()
-            if calls:
-                fieldnames = calls[0].keys()
-                writer = csv.DictWriter(output, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(calls)
-            return output.getvalue()
+            return ''.join(self._csv_chunks(self._calls()))
         else:
             raise ValueError(f"Unsupported export format: {format}")
 
+    def iter_csv(self, rows_per_chunk: int = 200):
+        """Yield the current history as CSV text in chunks, for streaming responses."""
+        self.flush()
+        calls = self._calls()
+        return self._csv_chunks(calls, rows_per_chunk)
+
+    @staticmethod
+    def _csv_chunks(calls: Sequence[Dict[str, Any]], rows_per_chunk: int = 200):
+        """Write calls as CSV through one reusable buffer, yielding it every rows_per_chunk rows."""
+        if not calls:
+            return
+        # Only log exports need these
+        import csv
+        import io
+        
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=calls[0].keys())
+        writer.writeheader()
+        for index, call in enumerate(calls, 1):
+            writer.writerow(call)
+            if index % rows_per_chunk == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        if buffer.tell():
+            yield buffer.getvalue()
+
 # Global API logger instance
 api_logger = APILogger()
\ No newline at end of file
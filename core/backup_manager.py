@@ -1,25 +1,47 @@
 """
 Configuration backup and restore functionality for production safety.
 """
-import json
 import logging
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+from core import json_codec
+
 logger = logging.getLogger(__name__)
 
+# Backup files are named {switch_ip}_{timestamp}.json by create_backup
+_BACKUP_NAME_RE = re.compile(r'(.+?)_(\d{8}_\d{6})\.json\Z')
+
 class BackupManager:
     """Manages configuration backups for rollback capabilities."""
     
     def __init__(self, backup_dir: str = "backups"):
         self.backup_dir = Path(backup_dir)
         self.backup_dir.mkdir(exist_ok=True)
+        # Backup files are written off the caller's thread; each write's future
+        # is kept until it finishes so readers can wait for it. A single writer
+        # keeps writes in submission order, so when two backups in the same
+        # second share a file name the newer config is the one left on disk
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='backup-writer')
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        # Backup metadata from the last directory scan, reused until the
+        # directory's mtime changes (any create, delete or out-of-band edit)
+        self._index: Optional[List[Dict[str, Any]]] = None
+        self._index_mtime: Optional[int] = None
+        self._index_lock = threading.Lock()
         
     def create_backup(self, switch_ip: str, config_data: Dict[str, Any]) -> str:
         """
         Create a configuration backup for a switch.
         Returns backup ID for future rollback operations.
+        
+        The backup is serialized here but written to disk in the background;
+        use wait_backup to block until the file exists.
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_id = f"{switch_ip}_{timestamp}"
@@ -37,59 +59,128 @@ class BackupManager:
         }
         
         try:
-            with open(backup_file, 'w') as f:
-                json.dump(backup_data, f, indent=2, default=str)
-            
-            logger.info(f"Created backup {backup_id} for switch {switch_ip}")
-            return backup_id
-            
+            payload = json_codec.dumps(backup_data, indent=True, default=str)
         except Exception as e:
             logger.error(f"Failed to create backup for {switch_ip}: {e}")
             raise
+        
+        future = self._writer.submit(self._write_backup, backup_id, backup_file, payload)
+        with self._pending_lock:
+            self._pending[backup_id] = future
+        future.add_done_callback(lambda done: self._finish_write(backup_id, done))
+        return backup_id
+    
+    def _write_backup(self, backup_id: str, backup_file: Path, payload: bytes) -> None:
+        """Write one serialized backup; runs on the writer pool."""
+        try:
+            backup_file.write_bytes(payload)
+            # Drop the listing before the future completes, so a reader woken by
+            # it never sees the old one; the directory mtime alone can be too coarse
+            self._invalidate_index()
+            logger.info(f"Created backup {backup_id}")
+        except Exception as e:
+            logger.error(f"Failed to write backup {backup_id}: {e}")
+            raise
+    
+    def _invalidate_index(self) -> None:
+        """Force the next listing to rescan the backup directory."""
+        with self._index_lock:
+            self._index = None
+    
+    def _finish_write(self, backup_id: str, future: Future) -> None:
+        """Forget a finished write unless a newer one took over its backup ID."""
+        with self._pending_lock:
+            if self._pending.get(backup_id) is future:
+                del self._pending[backup_id]
+    
+    def wait_backup(self, backup_id: str, timeout: Optional[float] = None) -> bool:
+        """Wait for a backup's background write; returns True if its file was written."""
+        with self._pending_lock:
+            future = self._pending.get(backup_id)
+        if future is None:
+            return (self.backup_dir / f"{backup_id}.json").exists()
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            return False
+    
+    def _wait_all(self) -> None:
+        """Wait for every backup write queued so far."""
+        with self._pending_lock:
+            futures = list(self._pending.values())
+        if futures:
+            wait(futures)
     
     def list_backups(self, switch_ip: Optional[str] = None) -> List[Dict[str, Any]]:
         """List available backups, optionally filtered by switch IP."""
+        self._wait_all()
+        with self._index_lock:
+            backups = [dict(backup) for backup in self._current_index()
+                       if switch_ip is None or backup.get('switch_ip') == switch_ip]
+                
+        return sorted(backups, key=lambda x: x['timestamp'], reverse=True)
+    
+    def _current_index(self) -> List[Dict[str, Any]]:
+        """Return the backup listing, rescanning only if the directory changed; caller holds _index_lock."""
+        mtime = self.backup_dir.stat().st_mtime_ns
+        if self._index is None or mtime != self._index_mtime:
+            self._index = self._scan_backups()
+            self._index_mtime = mtime
+        return self._index
+    
+    def _scan_backups(self) -> List[Dict[str, Any]]:
+        """Read the metadata of every backup file in the directory."""
         backups = []
         
         for backup_file in self.backup_dir.glob("*.json"):
             try:
-                with open(backup_file, 'r') as f:
-                    backup_data = json.load(f)
+                # The metadata is in the file name; only unrecognized names are parsed
+                name_match = _BACKUP_NAME_RE.match(backup_file.name)
+                if name_match:
+                    backup_data = {
+                        'backup_id': backup_file.stem,
+                        'switch_ip': name_match.group(1),
+                        'timestamp': name_match.group(2)
+                    }
+                else:
+                    backup_data = json_codec.loads(backup_file.read_bytes())
                 
-                if switch_ip is None or backup_data.get('switch_ip') == switch_ip:
-                    backups.append({
-                        'backup_id': backup_data.get('backup_id'),
-                        'switch_ip': backup_data.get('switch_ip'),
-                        'timestamp': backup_data.get('timestamp'),
-                        'file_size': backup_file.stat().st_size
-                    })
+                backups.append({
+                    'backup_id': backup_data.get('backup_id'),
+                    'switch_ip': backup_data.get('switch_ip'),
+                    'timestamp': backup_data.get('timestamp'),
+                    'file_size': backup_file.stat().st_size
+                })
                     
             except Exception as e:
                 logger.warning(f"Error reading backup file {backup_file}: {e}")
                 
-        return sorted(backups, key=lambda x: x['timestamp'], reverse=True)
+        return backups
     
     def get_backup(self, backup_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a specific backup by ID."""
+        self.wait_backup(backup_id)
         backup_file = self.backup_dir / f"{backup_id}.json"
         
         if not backup_file.exists():
             return None
             
         try:
-            with open(backup_file, 'r') as f:
-                return json.load(f)
+            return json_codec.loads(backup_file.read_bytes())
         except Exception as e:
             logger.error(f"Error loading backup {backup_id}: {e}")
             return None
     
     def delete_backup(self, backup_id: str) -> bool:
         """Delete a specific backup."""
+        self.wait_backup(backup_id)
         backup_file = self.backup_dir / f"{backup_id}.json"
         
         try:
             if backup_file.exists():
                 backup_file.unlink()
+                self._invalidate_index()
                 logger.info(f"Deleted backup {backup_id}")
                 return True
             return False
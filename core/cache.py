@@ -5,24 +5,52 @@ Provides a lightweight in-memory cache with automatic expiration
 to reduce API calls to switches and improve performance.
 """
 
+import heapq
+import logging
+import random
 import time
 import threading
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
 
+logger = logging.getLogger(__name__)
 
 class TTLCache:
-    """Thread-safe TTL cache with automatic expiration."""
+    """Thread-safe TTL cache with automatic expiration.
     
-    def __init__(self, default_ttl: int = 300):
+    Expiry uses the monotonic clock so wall-clock adjustments cannot
+    extend or cut short an entry's lifetime.
+    """
+    
+    def __init__(self, default_ttl: int = 300, maxsize: Optional[int] = None,
+                 jitter: float = 0):
         """
         Initialize TTL cache.
         
         Args:
             default_ttl: Default time-to-live in seconds (5 minutes)
+            maxsize: Maximum number of entries (unbounded if None)
+            jitter: Up to this many seconds are added at random to each TTL
+                so entries written together do not all expire together
         """
         self.default_ttl = default_ttl
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.maxsize = maxsize
+        self.jitter = jitter
+        # Parallel dicts keyed by cache key: the value, its monotonic expiry
+        # deadline and the TTL it was stored with (the stale window)
+        self._values: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._ttls: Dict[str, float] = {}
+        # (deadline, key) pairs in expiry order. Entries whose deadline no
+        # longer matches _expires (rewritten or removed keys) are skipped
+        # when popped
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # Keys grouped by everything up to their last ':' (for
+        # get_cached_or_fetch keys, the version and switch IP), so prefix
+        # invalidation only visits the matching groups
+        self._groups: Dict[str, Set[str]] = {}
         self.lock = threading.RLock()
+        # Per-key locks so only one caller fetches a missing key
+        self._fetch_locks: Dict[str, threading.Lock] = {}
     
     def get(self, key: str) -> Optional[Any]:
         """
@@ -35,16 +63,35 @@ class TTLCache:
             Cached value if exists and not expired, None otherwise
         """
         with self.lock:
-            if key not in self.cache:
+            expires_at = self._expires.get(key)
+            if expires_at is None:
                 return None
                 
-            entry = self.cache[key]
-            if time.time() > entry['expires_at']:
+            if time.monotonic() > expires_at:
                 # Entry expired, remove it
-                del self.cache[key]
+                self._remove(key)
                 return None
                 
-            return entry['value']
+            return self._values[key]
+    
+    def peek(self, key: str) -> Optional[Any]:
+        """
+        Get value from cache if not expired, leaving expired entries in place.
+        
+        Unlike get, an expired entry is not removed, so it can still be
+        served by get_or_refresh during its stale window.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value if exists and not expired, None otherwise
+        """
+        with self.lock:
+            expires_at = self._expires.get(key)
+            if expires_at is None or time.monotonic() > expires_at:
+                return None
+            return self._values[key]
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """
@@ -57,18 +104,32 @@ class TTLCache:
         """
         if ttl is None:
             ttl = self.default_ttl
+        if self.jitter:
+            ttl += random.uniform(0, self.jitter)
             
         with self.lock:
-            self.cache[key] = {
-                'value': value,
-                'expires_at': time.time() + ttl,
-                'created_at': time.time()
-            }
+            if self.maxsize is not None and key not in self._expires and len(self._expires) >= self.maxsize:
+                # Evict the entry closest to expiry
+                self._remove(self._pop_soonest())
+            expires_at = time.monotonic() + ttl
+            self._values[key] = value
+            self._expires[key] = expires_at
+            self._ttls[key] = ttl
+            self._groups.setdefault(key[:key.rfind(':') + 1], set()).add(key)
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            if len(self._expiry_heap) > 2 * len(self._expires) + 64:
+                # Too many skipped entries; rebuild from the live deadlines
+                self._expiry_heap = [(deadline, k) for k, deadline in self._expires.items()]
+                heapq.heapify(self._expiry_heap)
     
     def get_or_set(self, key: str, fetch_fn: Callable[[], Any], ttl: Optional[int] = None) -> Any:
         """
         Get cached value or fetch and cache if not available.
         
+        Concurrent misses on the same key are collapsed: one caller runs
+        fetch_fn while the others wait and then read the stored value. The
+        per-key lock is dropped once the fetch finishes.
+        
         Args:
             key: Cache key
             fetch_fn: Function to call if cache miss
@@ -82,10 +143,80 @@ class TTLCache:
         if cached_value is not None:
             return cached_value
             
-        # Cache miss - fetch and store
-        fresh_value = fetch_fn()
-        self.set(key, fresh_value, ttl)
-        return fresh_value
+        with self.lock:
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+        
+        fetch_lock.acquire()
+        try:
+            # Another caller may have filled the entry while we waited
+            cached_value = self.get(key)
+            if cached_value is not None:
+                return cached_value
+            
+            # Cache miss - fetch and store
+            fresh_value = fetch_fn()
+            self.set(key, fresh_value, ttl)
+            return fresh_value
+        finally:
+            self._release_fetch_lock(key, fetch_lock)
+    
+    def get_or_refresh(self, key: str, fetch_fn: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """
+        Get cached value, serving stale data while it is refreshed.
+        
+        Fresh entries are returned directly. Entries less than one extra TTL
+        past expiry are returned as-is while a background thread refetches
+        them. Anything older is fetched synchronously like get_or_set.
+        
+        Args:
+            key: Cache key
+            fetch_fn: Function to call to (re)fetch the value
+            ttl: Time-to-live in seconds (uses default if None)
+            
+        Returns:
+            Cached, stale or freshly fetched value
+        """
+        with self.lock:
+            expires_at = self._expires.get(key)
+            if expires_at is not None:
+                value = self._values[key]
+                stale_window = self._ttls[key]
+        
+        if expires_at is not None:
+            now = time.monotonic()
+            if now <= expires_at:
+                return value
+            if now <= expires_at + stale_window:
+                with self.lock:
+                    fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+                # Skip if a refresh (or blocking fetch) is already running
+                if fetch_lock.acquire(blocking=False):
+                    threading.Thread(target=self._refresh, args=(key, fetch_fn, ttl, fetch_lock),
+                                     daemon=True).start()
+                return value
+        
+        return self.get_or_set(key, fetch_fn, ttl)
+    
+    def _refresh(self, key: str, fetch_fn: Callable[[], Any], ttl: Optional[int],
+                 fetch_lock: threading.Lock) -> None:
+        """Refetch a stale entry in the background; the stale value stays on failure."""
+        try:
+            self.set(key, fetch_fn(), ttl)
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            self._release_fetch_lock(key, fetch_lock)
+    
+    def _release_fetch_lock(self, key: str, fetch_lock: threading.Lock) -> None:
+        """Release a per-key fetch lock and forget it so the lock table stays small.
+
+        Callers already waiting on the lock still re-check the cache once
+        they acquire it.
+        """
+        with self.lock:
+            if self._fetch_locks.get(key) is fetch_lock:
+                del self._fetch_locks[key]
+        fetch_lock.release()
     
     def invalidate(self, key: str) -> None:
         """
@@ -95,7 +226,46 @@ class TTLCache:
             key: Cache key to remove
         """
         with self.lock:
-            self.cache.pop(key, None)
+            self._remove(key)
+    
+    def _remove(self, key: str) -> None:
+        """Drop a key from all storage dicts; caller holds lock."""
+        self._values.pop(key, None)
+        self._expires.pop(key, None)
+        if self._ttls.pop(key, None) is not None:
+            group = key[:key.rfind(':') + 1]
+            keys = self._groups[group]
+            keys.discard(key)
+            if not keys:
+                del self._groups[group]
+    
+    def _pop_soonest(self) -> str:
+        """Pop and return the live key closest to expiry; caller holds lock."""
+        while True:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            if self._expires.get(key) == expires_at:
+                return key
+    
+    def invalidate_prefix(self, prefix: str) -> int:
+        """
+        Remove all keys starting with prefix.
+        
+        A key starting with prefix always belongs to a group that starts
+        with the prefix's own group, so only those groups are scanned.
+        
+        Args:
+            prefix: Key prefix to match
+            
+        Returns:
+            Number of keys removed
+        """
+        with self.lock:
+            group = prefix[:prefix.rfind(':') + 1]
+            keys_to_remove = [k for g, keys in self._groups.items() if g.startswith(group)
+                              for k in keys if k.startswith(prefix)]
+            for key in keys_to_remove:
+                self._remove(key)
+        return len(keys_to_remove)
     
     def invalidate_pattern(self, pattern: str) -> int:
         """
@@ -109,16 +279,20 @@ class TTLCache:
         """
         removed_count = 0
         with self.lock:
-            keys_to_remove = [k for k in self.cache.keys() if pattern in k]
+            keys_to_remove = [k for k in self._expires if pattern in k]
             for key in keys_to_remove:
-                del self.cache[key]
+                self._remove(key)
                 removed_count += 1
         return removed_count
     
     def clear(self) -> None:
         """Clear all cached entries."""
         with self.lock:
-            self.cache.clear()
+            self._values.clear()
+            self._expires.clear()
+            self._ttls.clear()
+            self._expiry_heap.clear()
+            self._groups.clear()
     
     def stats(self) -> Dict[str, Any]:
         """
@@ -128,10 +302,10 @@ class TTLCache:
             Dictionary with cache stats
         """
         with self.lock:
-            current_time = time.time()
-            total_entries = len(self.cache)
-            expired_entries = sum(1 for entry in self.cache.values() 
-                                if current_time > entry['expires_at'])
+            current_time = time.monotonic()
+            total_entries = len(self._expires)
+            expired_entries = sum(1 for expires_at in self._expires.values()
+                                if current_time > expires_at)
             
             return {
                 'total_entries': total_entries,
@@ -148,28 +322,38 @@ class TTLCache:
             Number of expired entries removed
         """
         removed_count = 0
-        current_time = time.time()
+        current_time = time.monotonic()
         
         with self.lock:
-            keys_to_remove = [
-                key for key, entry in self.cache.items()
-                if current_time > entry['expires_at']
-            ]
-            for key in keys_to_remove:
-                del self.cache[key]
-                removed_count += 1
+            # Only entries that are due are popped off the expiry heap
+            heap = self._expiry_heap
+            while heap and current_time > heap[0][0]:
+                expires_at, key = heapq.heappop(heap)
+                if self._expires.get(key) == expires_at:
+                    self._remove(key)
+                    removed_count += 1
                 
         return removed_count
 
 
+# Bump to invalidate every cached entry when the cached data shape changes
+CACHE_KEY_VERSION = 'v1'
+
+# Cache key prefixes made stale by each kind of switch write
+WRITE_INVALIDATES = {
+    'vlan_write': ('vlans', 'interfaces', 'overview'),
+    'interface_write': ('interfaces', 'poe', 'overview'),
+}
+
 # Global cache instances for different data types
-switch_cache = TTLCache(default_ttl=300)  # 5 minutes
-interface_cache = TTLCache(default_ttl=300)  # 5 minutes  
-vlan_cache = TTLCache(default_ttl=300)  # 5 minutes
+switch_cache = TTLCache(default_ttl=300, maxsize=512, jitter=30)  # 5 minutes
+interface_cache = TTLCache(default_ttl=300, maxsize=512, jitter=30)  # 5 minutes  
+vlan_cache = TTLCache(default_ttl=300, maxsize=512, jitter=30)  # 5 minutes
 
 
 def get_cached_or_fetch(cache: TTLCache, switch_ip: str, cache_key: str, 
-                       fetch_fn: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+                       fetch_fn: Callable[[], Any], ttl: Optional[int] = None,
+                       stale_while_revalidate: bool = False) -> Any:
     """
     Helper function to get cached data or fetch fresh data.
     
@@ -179,14 +363,33 @@ def get_cached_or_fetch(cache: TTLCache, switch_ip: str, cache_key: str,
         cache_key: Key for this specific data type
         fetch_fn: Function to fetch fresh data
         ttl: Optional TTL override
+        stale_while_revalidate: Serve recently expired data while refreshing
+            it in the background (see TTLCache.get_or_refresh)
         
     Returns:
         Cached or fresh data
     """
-    full_key = f"{switch_ip}:{cache_key}"
+    full_key = f"{CACHE_KEY_VERSION}:{switch_ip}:{cache_key}"
+    if stale_while_revalidate:
+        return cache.get_or_refresh(full_key, fetch_fn, ttl)
     return cache.get_or_set(full_key, fetch_fn, ttl)
 
 
+def get_cached(cache: TTLCache, switch_ip: str, cache_key: str) -> Optional[Any]:
+    """
+    Get fresh cached data for a switch without fetching it on a miss.
+    
+    Args:
+        cache: TTL cache instance to use
+        switch_ip: Switch IP address
+        cache_key: Key for this specific data type
+        
+    Returns:
+        Cached data, or None if nothing fresh is cached
+    """
+    return cache.peek(f"{CACHE_KEY_VERSION}:{switch_ip}:{cache_key}")
+
+
 def invalidate_switch_cache(switch_ip: str) -> None:
     """
     Invalidate all cached data for a specific switch.
@@ -194,7 +397,22 @@ def invalidate_switch_cache(switch_ip: str) -> None:
     Args:
         switch_ip: Switch IP address
     """
-    pattern = f"{switch_ip}:"
-    switch_cache.invalidate_pattern(pattern)
-    interface_cache.invalidate_pattern(pattern)
-    vlan_cache.invalidate_pattern(pattern)
\ No newline at end of file
+    prefix = f"{CACHE_KEY_VERSION}:{switch_ip}:"
+    switch_cache.invalidate_prefix(prefix)
+    interface_cache.invalidate_prefix(prefix)
+    vlan_cache.invalidate_prefix(prefix)
+
+
+def invalidate_switch_tags(switch_ip: str, write_kind: str) -> None:
+    """
+    Invalidate the cached data a write to a switch makes stale.
+    
+    Args:
+        switch_ip: Switch IP address
+        write_kind: Key of WRITE_INVALIDATES, e.g. 'vlan_write'
+    """
+    for tag in WRITE_INVALIDATES[write_kind]:
+        prefix = f"{CACHE_KEY_VERSION}:{switch_ip}:{tag}"
+        switch_cache.invalidate_prefix(prefix)
+        interface_cache.invalidate_prefix(prefix)
+        vlan_cache.invalidate_prefix(prefix)
@@ -4,11 +4,16 @@ Direct REST API implementation with VLAN name support and Central management det
 import requests
 import json
 import logging
+import ssl
 import time
+import threading
 import http.client as http_client
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from urllib.parse import urlparse
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config.settings import Config
 from config.switch_inventory import inventory
@@ -18,6 +23,7 @@ from core.exceptions import (
     VLANOperationError, UnknownSwitchError
 )
 from core.api_logger import api_logger
+from core import json_codec
 
 # Suppress InsecureRequestWarning for development
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -30,6 +36,77 @@ logging.getLogger('requests.packages.urllib3').setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+_verified_ssl_context = None
+_verified_ssl_context_lock = threading.Lock()
+
+def _get_verified_ssl_context() -> ssl.SSLContext:
+    """Process-wide TLS context with the CA bundle loaded once (used when SSL_VERIFY is on)."""
+    global _verified_ssl_context
+    with _verified_ssl_context_lock:
+        if _verified_ssl_context is None:
+            context = ssl.create_default_context(cafile=requests.certs.where())
+            context.set_alpn_protocols(['http/1.1'])
+            _verified_ssl_context = context
+        return _verified_ssl_context
+
+# In-flight requests per switch host, shared by every session to that switch
+_switch_slots: Dict[str, threading.BoundedSemaphore] = {}
+_switch_slots_lock = threading.Lock()
+# Seconds to wait for a free slot when a request has no timeout of its own
+SWITCH_SLOT_WAIT = 30
+
+def _switch_slot(host: str) -> threading.BoundedSemaphore:
+    """Return the request slots for a switch, creating them on first use."""
+    with _switch_slots_lock:
+        slot = _switch_slots.get(host)
+        if slot is None:
+            slot = _switch_slots[host] = threading.BoundedSemaphore(Config.SWITCH_MAX_CONNECTIONS)
+        return slot
+
+class _SwitchAdapter(HTTPAdapter):
+    """HTTPAdapter that caps in-flight requests per switch at SWITCH_MAX_CONNECTIONS.
+
+    The connection pool does not block, so without this bound route threads,
+    startup warmup and background cache refreshes hitting one switch together
+    would each open a new TLS connection past the kept-alive ones. A request
+    that gets no slot within its own timeout fails with ConnectTimeout.
+    """
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        host = urlparse(request.url).hostname
+        wait = timeout
+        if isinstance(wait, tuple):
+            wait = sum(part for part in wait if part)
+        slot = _switch_slot(host)
+        if not slot.acquire(timeout=wait or SWITCH_SLOT_WAIT):
+            raise requests.exceptions.ConnectTimeout(f"No free connection slot for {host}", request=request)
+        try:
+            return super().send(request, stream=stream, timeout=timeout, **kwargs)
+        finally:
+            slot.release()
+
+class _SharedContextAdapter(_SwitchAdapter):
+    """HTTPAdapter that verifies certificates against the shared TLS context.
+
+    requests otherwise hands the CA bundle path to every new connection,
+    which re-reads and re-parses the bundle on each TLS handshake. Requests
+    made with verify=False or a custom bundle path keep the default handling.
+    """
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        if verify is True:
+            pool_kwargs['ssl_context'] = _get_verified_ssl_context()
+        return host_params, pool_kwargs
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        shared = _verified_ssl_context
+        if shared is not None and getattr(conn, 'conn_kw', {}).get('ssl_context') is shared:
+            # The default bundle is already loaded into the shared context
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
 class DirectRestManager:
     """Direct REST API manager with VLAN names and Central management detection."""
     
@@ -38,28 +115,48 @@ class DirectRestManager:
         self.sessions: Dict[str, requests.Session] = {}
         self.switch_api_versions: Dict[str, str] = {}
         self.session_timeouts: Dict[str, float] = {}
+        # One login at a time per switch; concurrent request threads would
+        # otherwise each open a session and run into the switch session limit
+        self._auth_locks: Dict[str, threading.Lock] = {}
+        self._auth_locks_guard = threading.Lock()
     
+    def _new_session(self) -> requests.Session:
+        """Create a session with a bounded keep-alive pool for a single switch.
+
+        Up to SWITCH_MAX_CONNECTIONS connections are kept alive, and the
+        adapter allows no more requests than that in flight per switch, so
+        concurrent calls reuse them instead of opening extra TLS connections.
+        Reads are retried briefly on gateway errors or a dropped keep-alive
+        connection; connect failures are not, so unreachable switches still
+        fail after a single timeout. With SSL_VERIFY on, all sessions verify
+        against one shared TLS context.
+        """
+        sess = requests.Session()
+        sess.verify = self.config.SSL_VERIFY
+        retry = Retry(total=2, connect=0, read=1, backoff_factor=0.2,
+                      status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({'GET', 'HEAD'}),
+                      raise_on_status=False)
+        adapter_class = _SharedContextAdapter if self.config.SSL_VERIFY else _SwitchAdapter
+        adapter = adapter_class(pool_connections=1,
+                                pool_maxsize=self.config.SWITCH_MAX_CONNECTIONS,
+                                max_retries=retry,
+                                pool_block=False)
+        sess.mount('https://', adapter)
+        return sess
+
     def _log_api_call(self, method: str, url: str, headers: Dict, data: Any, 
-                     response: requests.Response, start_time: float, switch_ip: str = None):
+                     response: requests.Response, start_time: float, switch_ip: str):
         """Helper method to log API calls with comprehensive details."""
         duration_ms = (time.time() - start_time) * 1000
         
-        # Extract switch IP from URL if not provided
-        if not switch_ip:
-            try:
-                from urllib.parse import urlparse
-                parsed = urlparse(url)
-                switch_ip = parsed.hostname
-            except Exception:
-                switch_ip = 'unknown'
-        
         api_logger.log_api_call(
             method=method,
             url=url,
             headers=headers,
             request_data=data,
             response_code=response.status_code,
-            response_text=response.text,
+            response_text=response.content,
             duration_ms=duration_ms,
             switch_ip=switch_ip
         )
@@ -69,7 +166,7 @@ class DirectRestManager:
             try:
                 if force_logout:
                     sess = self.sessions[switch_ip]
-                    base = self._get_base_url(switch_ip)
+                    base = self.base_url(switch_ip)
                     resp = sess.post(f"{base}/logout", timeout=5)
                     logger.debug(f"LOGOUT {base}/logout: {resp.status_code}")
             except Exception as e:
@@ -112,12 +209,12 @@ class DirectRestManager:
                     temp_session.verify = self.config.SSL_VERIFY
                     
                     # Try to login and immediately logout to clear a session slot
-                    auth_url = f"https://{switch_ip}/rest/v10.09/login?username={username}&password={password or ''}"
+                    auth_url = f"{self.base_url(switch_ip)}/login?username={username}&password={password or ''}"
                     response = temp_session.post(auth_url, headers={'accept': '*/*'}, data="", timeout=5)
                     
                     if response.status_code == 200:
                         # Successful login, now logout
-                        logout_url = f"https://{switch_ip}/rest/v10.09/logout"
+                        logout_url = f"{self.base_url(switch_ip)}/logout"
                         temp_session.post(logout_url, timeout=5)
                         logger.info(f"Cleared session for {username} on {switch_ip}")
                         return True
@@ -169,11 +266,10 @@ class DirectRestManager:
     def test_connection_with_credentials(self, switch_ip: str, username: str, password: str) -> Dict[str, Any]:
         """Test connection using confirmed working method with proper error handling."""
         try:
-            sess = requests.Session()
-            sess.verify = Config.SSL_VERIFY
+            sess = self._new_session()
             
             # Use confirmed working method: query parameter POST to v10.09
-            auth_url = f"https://{switch_ip}/rest/v10.09/login?username={username}&password={password}"
+            auth_url = f"{self.base_url(switch_ip)}/login?username={username}&password={password}"
             logger.info(f"Testing credentials for {username}@{switch_ip}")
             
             # Log authentication attempt
@@ -187,14 +283,14 @@ class DirectRestManager:
             
             if resp.status_code == 200 and sess.cookies.get_dict():
                 # Test system access
-                sys_url = f"https://{switch_ip}/rest/v10.09/system"
+                sys_url = f"{self.base_url(switch_ip)}/system"
                 start_time = time.time()
                 s2 = sess.get(sys_url, timeout=10, verify=sess.verify)
                 self._log_api_call('GET', sys_url, {}, None, s2, start_time, switch_ip)
                 logger.info(f"SYSTEM access status: {s2.status_code}")
                 
                 if s2.status_code == 200:
-                    info = s2.json()
+                    info = json_codec.loads(s2.content)
                     # Store successful session for reuse
                     self.sessions[switch_ip] = sess
                     self.session_timeouts[switch_ip] = time.time() + 900
@@ -204,7 +300,7 @@ class DirectRestManager:
                         'ip_address': switch_ip,
                         'firmware_version': info.get('software_version', 'Unknown'),
                         'model': info.get('platform_name', 'Unknown'),
-                        'api_version': 'v10.09',
+                        'api_version': self.config.REST_API_VERSION,
                         'last_seen': datetime.now().isoformat()
                     }
                 else:
@@ -231,7 +327,7 @@ class DirectRestManager:
         if switch_ip in self.session_timeouts and time.time() > self.session_timeouts[switch_ip]:
             logger.debug(f"Session expired for {switch_ip}")
             return False
-        url = f"{self._get_base_url(switch_ip)}/system"
+        url = f"{self.base_url(switch_ip)}/system"
         r = session.get(url, timeout=5)
         logger.debug(f"Validate session GET {url}: {r.status_code}")
         return r.status_code == 200
@@ -241,7 +337,7 @@ class DirectRestManager:
         try:
             response = requests.get(f"https://{switch_ip}/rest", verify=self.config.SSL_VERIFY, timeout=10)
             if response.status_code == 200:
-                versions_data = response.json()
+                versions_data = json_codec.loads(response.content)
                 return list(versions_data.keys())
             return ['v10.09']  # Fallback to confirmed working version
         except Exception as e:
@@ -258,12 +354,20 @@ class DirectRestManager:
         logger.debug(f"Using confirmed working API version v10.09 for {switch_ip}")
         return 'v10.09'
 
-    def _get_base_url(self, switch_ip: str) -> str:
-        """Get base URL using confirmed working API version v10.09."""
-        return f"https://{switch_ip}/rest/v10.09"
+    def base_url(self, switch_ip: str) -> str:
+        """Get the REST base URL for a switch, e.g. https://10.0.0.1/rest/v10.09."""
+        return f"https://{switch_ip}/rest/{self.config.REST_API_VERSION}"
+
+    def _auth_lock(self, switch_ip: str) -> threading.Lock:
+        with self._auth_locks_guard:
+            return self._auth_locks.setdefault(switch_ip, threading.Lock())
 
     def _authenticate(self, switch_ip: str) -> requests.Session:
         """Authenticate using confirmed working method: query parameter POST to v10.09."""
+        with self._auth_lock(switch_ip):
+            return self._authenticate_locked(switch_ip)
+
+    def _authenticate_locked(self, switch_ip: str) -> requests.Session:
         if switch_ip in self.sessions:
             sess = self.sessions[switch_ip]
             if self._is_session_valid(switch_ip, sess):
@@ -271,15 +375,15 @@ class DirectRestManager:
                 return sess
             self.cleanup_session(switch_ip, force_logout=False)
         
-        sess = requests.Session()
-        sess.verify = self.config.SSL_VERIFY
+        sess = self._new_session()
         
         # Use confirmed working method: query parameter POST to v10.09
-        auth_url = f"https://{switch_ip}/rest/v10.09/login?username={self.config.SWITCH_USER}&password={self.config.SWITCH_PASSWORD}"
+        auth_url = f"{self.base_url(switch_ip)}/login?username={self.config.SWITCH_USER}&password={self.config.SWITCH_PASSWORD}"
         logger.debug(f"Authenticating with query parameters: {auth_url}")
         resp = sess.post(auth_url, headers={'accept': '*/*'}, data="", timeout=10, verify=sess.verify)
-        logger.debug(f"AUTH LOGIN {resp.status_code}\nHEADERS: {resp.headers}\nBODY: {resp.text!r}")
-        logger.debug(f"Cookies after AUTH_LOGIN: {sess.cookies.get_dict()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("AUTH LOGIN %s\nHEADERS: %s\nBODY: %r", resp.status_code, resp.headers, resp.text)
+            logger.debug("Cookies after AUTH_LOGIN: %s", sess.cookies.get_dict())
         
         if resp.status_code == 200 and sess.cookies.get_dict():
             self.sessions[switch_ip] = sess
@@ -296,9 +400,10 @@ class DirectRestManager:
                 raise Exception(f"Failed to authenticate to {switch_ip}: {resp.status_code} - {resp.text}")
 
     def _detect_central_management(self, switch_ip: str, session: requests.Session) -> tuple[bool,str]:
-        url = f"{self._get_base_url(switch_ip)}/system/vlans"
+        url = f"{self.base_url(switch_ip)}/system/vlans"
         r = session.post(url, json={"id":99999,"name":"central_test","admin":"up"}, timeout=5)
-        logger.debug(f"CENTRAL test POST {url}: {r.status_code}\nBODY: {r.text!r}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("CENTRAL test POST %s: %s\nBODY: %r", url, r.status_code, r.text)
         if r.status_code in (410,403):
             return True, 'Central-managed'
         if r.status_code == 400:
@@ -308,7 +413,7 @@ class DirectRestManager:
     def test_connection(self, switch_ip: str) -> Dict[str, Any]:
         try:
             sess = self._authenticate(switch_ip)
-            base = self._get_base_url(switch_ip)
+            base = self.base_url(switch_ip)
             start_time = time.time()
             r = sess.get(f"{base}/system", timeout=10)
             # Log system info GET
@@ -319,7 +424,7 @@ class DirectRestManager:
             logger.debug(f"GET {base}/system: {r.status_code}")
             if r.status_code != 200:
                 raise Exception(f"System info failed: {r.status_code}")
-            info = r.json()
+            info = json_codec.loads(r.content)
             # Log Central detection call as well
             try:
                 cd_start = time.time()
@@ -357,7 +462,7 @@ class DirectRestManager:
     def list_vlans(self, switch_ip: str, load_details: bool = True) -> List[Dict[str, Any]]:
         """List VLANs with real names, supports depth=2 for v10.x."""
         session = self._authenticate(switch_ip)
-        base = self._get_base_url(switch_ip)
+        base = self.base_url(switch_ip)
         version = self.switch_api_versions.get(switch_ip,'v1')
         # Attempt bulk details
         if load_details and version in ['v10.04','v10.09','latest']:
@@ -369,7 +474,7 @@ class DirectRestManager:
                 pass
             logger.debug(f"Depth-2 VLAN GET: {r.status_code}")
             if r.status_code == 200:
-                data = r.json()
+                data = json_codec.loads(r.content)
                 vlans=[]
                 for vid,det in data.items():
                     try:
@@ -398,7 +503,7 @@ class DirectRestManager:
             if r.status_code==410:
                 raise Exception('VLAN listing blocked')
             raise Exception(f"VLAN list failed: {r.status_code}")
-        data = r.json()
+        data = json_codec.loads(r.content)
         vlans = []
         if isinstance(data, dict):
             for vid, uri in data.items():
@@ -414,7 +519,7 @@ class DirectRestManager:
                         except Exception:
                             pass
                         if dr.status_code==200:
-                            det=dr.json()
+                            det=json_codec.loads(dr.content)
                             name=det.get('name',f'VLAN{vid_num}')
                             admin=det.get('admin','unknown')
                             oper=det.get('oper_state','unknown')
@@ -439,7 +544,7 @@ class DirectRestManager:
                     except Exception:
                         pass
                     if dr.status_code==200:
-                        det=dr.json()
+                        det=json_codec.loads(dr.content)
                         name=det.get('name',f'VLAN{vid_num}')
                         admin=det.get('admin','up')
                         oper=det.get('oper_state','up')
@@ -459,7 +564,7 @@ class DirectRestManager:
             raise ValueError("VLAN name cannot be empty")
         
         session = self._authenticate(switch_ip)
-        base = self._get_base_url(switch_ip)
+        base = self.base_url(switch_ip)
         
         # Check if VLAN already exists
         start_time = time.time()
@@ -480,7 +585,8 @@ class DirectRestManager:
         start_time = time.time()
         resp = session.post(f"{base}/system/vlans", json=payload, timeout=10)
         self._log_api_call('POST', f"{base}/system/vlans", {'Content-Type': 'application/json'}, payload, resp, start_time, switch_ip)
-        logger.debug(f"Create VLAN response: {resp.status_code}\nBODY: {resp.text}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Create VLAN response: %s\nBODY: %s", resp.status_code, resp.text)
         
         if resp.status_code == 201:  # Expected success code for POST creation
             inventory.update_switch_status(switch_ip, 'online')
@@ -500,13 +606,14 @@ class DirectRestManager:
         if vlan_id==1:
             raise ValueError("Cannot delete default VLAN 1")
         session = self._authenticate(switch_ip)
-        base = self._get_base_url(switch_ip)
+        base = self.base_url(switch_ip)
         dr = session.get(f"{base}/system/vlans/{vlan_id}", timeout=10)
         logger.debug(f"Delete VLAN exists check: {dr.status_code}")
         if dr.status_code==404:
             return f"VLAN {vlan_id} does not exist on {switch_ip}"
         resp = session.delete(f"{base}/system/vlans/{vlan_id}", timeout=10)
-        logger.debug(f"Delete VLAN response: {resp.status_code}\nBODY: {resp.text}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Delete VLAN response: %s\nBODY: %s", resp.status_code, resp.text)
         if resp.status_code in (200,204):
             inventory.update_switch_status(switch_ip,'online')
             return f"Successfully deleted VLAN {vlan_id} from {switch_ip}"
@@ -0,0 +1,57 @@
+"""
+JSON encoding and decoding helpers.
+
+Uses orjson when it is installed for faster parsing of large switch
+responses and falls back to the standard library json module otherwise.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is used instead
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode a JSON document.
+
+    Args:
+        data: Raw response body (e.g. response.content)
+
+    Returns:
+        Decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode an object as UTF-8 JSON bytes.
+
+    Non-string dict keys (such as integer VLAN IDs) are converted to strings
+    the same way the stdlib encoder does.
+
+    Args:
+        obj: Object to encode
+        indent: Pretty-print with two-space indentation
+        default: Called for objects the stdlib encoder cannot serialize
+            (e.g. str); datetimes and dataclasses go through it too, so the
+            output matches json.dumps(default=...)
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if default is not None:
+            option |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=default).encode('utf-8')
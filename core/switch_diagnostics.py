@@ -12,6 +12,8 @@ from datetime import datetime
 from typing import Dict, List, Tuple, Any
 import time
 
+from core import json_codec
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class SwitchDiagnostics:
@@ -405,7 +407,7 @@ class SwitchDiagnostics:
                 try:
                     response = session.get(f"{self.base_url}/rest/{version}/system", verify=False, timeout=10)
                     if response.status_code == 200:
-                        system_info = response.json()
+                        system_info = json_codec.loads(response.content)
                         self.results["https_config"][version] = {
                             "system_accessible": True,
                             "system_info": system_info
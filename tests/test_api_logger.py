@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+API Logger Tests
+Tests that queued API calls are recorded, sanitized and truncated
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.api_logger import APILogger
+
+
+class TestAPILogger(unittest.TestCase):
+    """Test API call logging"""
+
+    def setUp(self):
+        self.api_logger = APILogger(max_history=10)
+
+    def test_queued_calls_visible_to_readers(self):
+        """Test that calls logged just before a read are returned by it"""
+        for _ in range(3):
+            self.api_logger.log_api_call('GET', 'https://10.0.0.1/rest/v10.09/system', {}, None, 200, b'{}', 5, '10.0.0.1')
+        calls = self.api_logger.get_recent_calls(limit=0)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[0]['switch_ip'], '10.0.0.1')
+
+    def test_history_is_bounded(self):
+        """Test that only max_history entries are kept"""
+        for _ in range(25):
+            self.api_logger.log_api_call('GET', 'https://10.0.0.1/rest/v10.09/system', {}, None, 200, '', 1, '10.0.0.1')
+        self.assertEqual(self.api_logger.get_call_statistics()['total_calls'], 10)
+
+    def test_ids_unique_after_history_wraps(self):
+        """Test that entry ids keep increasing once old entries are evicted"""
+        for _ in range(25):
+            self.api_logger.log_api_call('GET', 'https://10.0.0.1/rest/v10.09/system', {}, None, 200, '', 1, '10.0.0.1')
+        ids = [call['id'] for call in self.api_logger.get_recent_calls(limit=0)]
+        self.assertEqual(sorted(ids), list(range(16, 26)))
+
+    def test_statistics_track_evictions(self):
+        """Test that running statistics only cover the calls still in history"""
+        for _ in range(10):
+            self.api_logger.log_api_call('GET', 'https://10.0.0.1/rest/v10.09/system', {}, None, 500, '', 4, '10.0.0.1')
+        for _ in range(10):
+            self.api_logger.log_api_call('GET', 'https://10.0.0.2/rest/v10.09/system', {}, None, 200, '', 2, '10.0.0.2')
+        stats = self.api_logger.get_call_statistics()
+        self.assertEqual(stats['successful_calls'], 10)
+        self.assertEqual(stats['average_duration'], 2)
+        self.assertEqual(stats['switches'], {'10.0.0.2': 10})
+
+    def test_sensitive_data_redacted(self):
+        """Test that passwords and auth headers are not stored"""
+        self.api_logger.log_api_call('POST', 'https://10.0.0.1/rest/v10.09/login',
+                                     {'Cookie': 'id=abc'}, 'username=admin&password=secret',
+                                     200, '', 1, '10.0.0.1')
+        call = self.api_logger.get_recent_calls(limit=1)[0]
+        self.assertEqual(call['headers']['Cookie'], '***REDACTED***')
+        self.assertNotIn('secret', call['request_data'])
+
+    def test_bytes_response_truncated(self):
+        """Test that large byte bodies are stored as a decoded prefix"""
+        self.api_logger.log_api_call('GET', 'https://10.0.0.1/rest/v10.09/system/interfaces', {}, None,
+                                     503, b'x' * 5000, 1, '10.0.0.1')
+        call = self.api_logger.get_recent_calls(limit=1)[0]
+        self.assertEqual(call['response_size'], 5000)
+        self.assertTrue(call['response_text'].startswith('x' * 1000))
+        self.assertIn('full length: 5000 bytes', call['response_text'])
+
+    def test_successful_read_body_not_stored(self):
+        """Test that bodies of successful switch reads are dropped but failures keep theirs"""
+        self.api_logger.log_api_call('GET', 'https://10.0.0.1/rest/v10.09/system/interfaces', {}, None,
+                                     200, b'{"1/1/1": {}}', 1, '10.0.0.1')
+        self.api_logger.log_api_call('GET', 'https://10.0.0.1/rest/v10.09/system/interfaces', {}, None,
+                                     500, "{'error': 'timeout'}", 1, '10.0.0.1')
+        failed, succeeded = self.api_logger.get_recent_calls(limit=2)
+        self.assertEqual(succeeded['response_text'], '')
+        self.assertEqual(succeeded['response_size'], 13)
+        self.assertIn('timeout', failed['response_text'])
+
+
+if __name__ == '__main__':
+    unittest.main()
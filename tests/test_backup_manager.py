@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Backup Manager Tests
+Tests background backup writes and the cached backup listing
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.backup_manager import BackupManager
+
+
+class TestBackupManager(unittest.TestCase):
+    """Test configuration backups"""
+
+    def setUp(self):
+        self.backup_dir = tempfile.mkdtemp()
+        self.manager = BackupManager(self.backup_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.backup_dir, ignore_errors=True)
+
+    def test_backup_visible_right_after_create(self):
+        """Test that readers see a backup as soon as create_backup returns"""
+        backup_id = self.manager.create_backup('10.0.0.1', {'vlans': [10]})
+        self.assertEqual(self.manager.get_backup(backup_id)['config'], {'vlans': [10]})
+        self.assertEqual([b['backup_id'] for b in self.manager.list_backups('10.0.0.1')], [backup_id])
+
+    def test_failed_write_reported_by_wait_backup(self):
+        """Test that wait_backup returns False when the background write fails"""
+        shutil.rmtree(self.backup_dir)
+        backup_id = self.manager.create_backup('10.0.0.1', {'vlans': [10]})
+        self.assertFalse(self.manager.wait_backup(backup_id, timeout=5))
+
+    def test_listing_refreshed_when_directory_mtime_unchanged(self):
+        """Test that new and deleted backups show up even if the directory mtime does not move"""
+        fixed = os.stat(self.backup_dir).st_mtime_ns
+
+        def hold_mtime():
+            os.utime(self.backup_dir, ns=(fixed, fixed))
+
+        first = self.manager.create_backup('10.0.0.1', {'vlans': [10]})
+        self.manager.wait_backup(first)
+        hold_mtime()
+        self.assertEqual(len(self.manager.list_backups()), 1)
+
+        second = self.manager.create_backup('10.0.0.2', {'vlans': [20]})
+        self.manager.wait_backup(second)
+        hold_mtime()
+        self.assertEqual({b['backup_id'] for b in self.manager.list_backups()}, {first, second})
+
+        self.assertTrue(self.manager.delete_backup(first))
+        hold_mtime()
+        self.assertEqual([b['backup_id'] for b in self.manager.list_backups()], [second])
+
+
+if __name__ == '__main__':
+    unittest.main()
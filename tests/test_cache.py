@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+TTL Cache Tests
+Tests expiry, size bounds and single-flight fetching of core.cache.TTLCache
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cache import TTLCache, get_cached_or_fetch, interface_cache, switch_cache, invalidate_switch_tags
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test TTL cache behaviour"""
+
+    def test_entry_expires(self):
+        """Test that entries are dropped after their TTL"""
+        cache = TTLCache(default_ttl=0.05)
+        cache.set('k', 'v')
+        self.assertEqual(cache.get('k'), 'v')
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('k'))
+
+    def test_maxsize_evicts_soonest_expiry(self):
+        """Test that a full cache evicts the entry closest to expiry"""
+        cache = TTLCache(default_ttl=60, maxsize=2)
+        cache.set('a', 1, ttl=10)
+        cache.set('b', 2, ttl=60)
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_cleanup_removes_only_due_entries(self):
+        """Test that cleanup drops expired keys but keeps ones rewritten with a longer TTL"""
+        cache = TTLCache(default_ttl=0.05)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('b', 3, ttl=60)
+        cache.set('c', 4, ttl=60)
+        time.sleep(0.1)
+        self.assertEqual(cache.cleanup_expired(), 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 3)
+        self.assertEqual(cache.stats()['total_entries'], 2)
+
+    def test_concurrent_misses_fetch_once(self):
+        """Test that concurrent misses on one key run the fetch only once"""
+        cache = TTLCache(default_ttl=60)
+        calls = []
+        start = threading.Barrier(8)
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'fresh'
+
+        results = []
+
+        def worker():
+            start.wait()
+            results.append(cache.get_or_set('k', fetch))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['fresh'] * 8)
+
+    def test_stale_entry_served_while_refreshing(self):
+        """Test that a recently expired entry is returned and refreshed in the background"""
+        cache = TTLCache(default_ttl=0.2)
+        cache.set('k', 'old')
+        time.sleep(0.25)
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return 'new'
+
+        self.assertEqual(cache.get_or_refresh('k', fetch), 'old')
+        self.assertTrue(refreshed.wait(1))
+        time.sleep(0.05)
+        self.assertEqual(cache.get('k'), 'new')
+
+    def test_long_expired_entry_fetched_synchronously(self):
+        """Test that entries past the stale window are refetched inline"""
+        cache = TTLCache(default_ttl=0.05)
+        cache.set('k', 'old')
+        time.sleep(0.15)
+        self.assertEqual(cache.get_or_refresh('k', lambda: 'new'), 'new')
+
+    def test_peek_keeps_stale_entry(self):
+        """Test that peeking at an expired entry leaves it for stale serving"""
+        cache = TTLCache(default_ttl=0.2)
+        cache.set('k', 'old')
+        self.assertEqual(cache.peek('k'), 'old')
+        time.sleep(0.25)
+        self.assertIsNone(cache.peek('k'))
+        self.assertEqual(cache.get_or_refresh('k', lambda: 'new'), 'old')
+
+    def test_write_invalidates_only_related_keys(self):
+        """Test that a VLAN write drops interface data but not PoE data for that switch"""
+        interface_cache.clear()
+        switch_cache.clear()
+        get_cached_or_fetch(interface_cache, '10.0.0.1', 'interfaces_bulk', lambda: 'ifaces')
+        get_cached_or_fetch(interface_cache, '10.0.0.1', 'poe_bulk', lambda: 'poe')
+        get_cached_or_fetch(interface_cache, '110.0.0.1', 'interfaces_bulk', lambda: 'other')
+        get_cached_or_fetch(switch_cache, '10.0.0.1', 'overview', lambda: 'overview')
+
+        invalidate_switch_tags('10.0.0.1', 'vlan_write')
+
+        self.assertEqual(get_cached_or_fetch(interface_cache, '10.0.0.1', 'interfaces_bulk', lambda: 'new'), 'new')
+        self.assertEqual(get_cached_or_fetch(interface_cache, '10.0.0.1', 'poe_bulk', lambda: 'new'), 'poe')
+        self.assertEqual(get_cached_or_fetch(interface_cache, '110.0.0.1', 'interfaces_bulk', lambda: 'new'), 'other')
+        self.assertEqual(get_cached_or_fetch(switch_cache, '10.0.0.1', 'overview', lambda: 'new'), 'new')
+
+
+if __name__ == '__main__':
+    unittest.main()